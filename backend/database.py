@@ -1,3 +1,4 @@
+import asyncio
 import os
 import json
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
@@ -5,6 +6,12 @@ from sqlalchemy.orm import sessionmaker, declarative_base
 
 DATABASE_URL = os.getenv("DATABASE_URL", "")
 
+# The engine is genuinely async (create_async_engine over the asyncpg
+# driver), so route handlers stay `async def` and await their queries on
+# the event loop - no sync engine wrapped in a threadpool anywhere.
+# Keep it that way: a sync handler or sync Session here would tie up
+# threadpool workers and cap concurrency at the pool size.
+
 # Built-in Role Templates (v1) - following the Role Definition Contract
 ROLE_TEMPLATES_V1 = [
     {
@@ -428,7 +435,19 @@ Base = declarative_base()
 def get_engine():
     global engine
     if engine is None and DATABASE_URL:
-        engine = create_async_engine(DATABASE_URL, echo=False)
+        engine = create_async_engine(
+            DATABASE_URL,
+            echo=False,
+            # Keep a warm pool large enough for request bursts instead of
+            # opening fresh TCP+TLS connections under load
+            pool_size=20,
+            max_overflow=10,
+            pool_timeout=30,
+            # Heroku/Postgres drop idle connections; recycle and pre-ping so
+            # requests never inherit a dead one
+            pool_recycle=1800,
+            pool_pre_ping=True,
+        )
     return engine
 
 
@@ -450,6 +469,24 @@ async def get_db():
         yield session
 
 
+async def execute_concurrent(*stmts):
+    """Run independent SELECTs concurrently, one pooled session per statement.
+
+    A single AsyncSession is not safe for concurrent use, so each statement
+    gets its own session; wall time approaches the slowest query instead of
+    the sum of all of them. Returns results in statement order.
+    """
+    session_maker = get_session_maker()
+    if session_maker is None:
+        raise Exception("Database not configured")
+
+    async def run(stmt):
+        async with session_maker() as session:
+            return await session.execute(stmt)
+
+    return await asyncio.gather(*(run(s) for s in stmts))
+
+
 async def init_db():
     """Create all tables."""
     engine = get_engine()
@@ -769,3 +806,49 @@ async def run_migrations():
             """))
             await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_request_messages_request_id ON request_messages(request_id)"))
             await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_request_messages_owner_id ON request_messages(owner_id)"))
+
+            # Composite indexes for the hot list paths: every list endpoint
+            # filters by owner (and sometimes employee/project) and orders by
+            # created_at DESC, so cover both in one index scan
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_requests_owner_created ON requests(owner_id, created_at DESC)"
+            ))
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_deliverables_owner_created ON deliverables(owner_id, created_at DESC)"
+            ))
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_dm_files_employee_owner_created ON dm_files(employee_id, owner_id, created_at)"
+            ))
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_messages_project_owner_created ON messages(project_id, owner_id, created_at)"
+            ))
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_messages_employee_owner_created "
+                "ON messages(employee_id, owner_id, created_at) WHERE project_id IS NULL"
+            ))
+
+            # Enforce valid request types at the DB level (mirrors the
+            # Literal type on CreateRequestBody); ADD CONSTRAINT has no
+            # IF NOT EXISTS so guard with a DO block
+            await conn.execute(text("""
+                DO $$
+                BEGIN
+                    IF NOT EXISTS (
+                        SELECT 1 FROM pg_constraint WHERE conname = 'ck_requests_request_type'
+                    ) THEN
+                        ALTER TABLE requests ADD CONSTRAINT ck_requests_request_type
+                            CHECK (request_type IN ('roadmap', 'analysis', 'audit', 'review', 'research', 'custom'));
+                    END IF;
+                END $$
+            """))
+
+            # Composite indexes backing keyset pagination on the memory
+            # list endpoints (owner filter + created_at DESC ordering)
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_memories_owner_created "
+                "ON memories(owner_id, created_at DESC)"
+            ))
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_memory_suggestions_owner_created "
+                "ON memory_suggestions(owner_id, created_at DESC)"
+            ))
@@ -1,7 +1,8 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from sqlalchemy import text
 import os
 
@@ -21,7 +22,7 @@ from routes_usage import router as usage_router
 from routes_export import router as export_router
 from routes_roles import router as roles_router
 from routes_memory_suggestions import router as memory_suggestions_router
-from routes_google import router as google_router
+from routes_google import router as google_router, close_http_client
 from routes_dashboard import router as dashboard_router
 from routes_processing import router as processing_router
 import models  # noqa: F401 - Import to register models with Base
@@ -33,10 +34,18 @@ async def lifespan(app: FastAPI):
     await init_db()
     await run_migrations()
     yield
-    # Shutdown: nothing to do
+    # Shutdown: release pooled Google API connections
+    await close_http_client()
 
 
-app = FastAPI(lifespan=lifespan)
+# orjson serializes dicts several times faster than stdlib json and handles
+# datetime/UUID values natively, so list endpoints skip per-row isoformat/str
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# Compress JSON responses - list endpoints return arrays of dicts with
+# repeating keys that gzip shrinks 5-10x. Small bodies (and streamed
+# responses like SSE/PDF downloads) are left untouched.
+app.add_middleware(GZipMiddleware, minimum_size=500)
 
 # Register routers
 app.include_router(auth_router)
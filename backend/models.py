@@ -267,7 +267,8 @@ class Request(Base):
 
     owner = relationship("User")
     project = relationship("Project")
-    deliverables = relationship("Deliverable", back_populates="request", cascade="all, delete-orphan")
+    deliverables = relationship("Deliverable", back_populates="request", cascade="all, delete-orphan",
+                                order_by="desc(Deliverable.created_at)")
     messages = relationship("RequestMessage", back_populates="request", cascade="all, delete-orphan")
 
 
@@ -1,14 +1,20 @@
+from datetime import datetime
+from functools import lru_cache
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from pydantic import BaseModel
 from typing import List, Optional
 from uuid import UUID
-import json
+import orjson
+import re
 
 from auth import require_auth
-from database import get_db
+from database import get_db, execute_concurrent, get_session_maker
 from models import User, Employee, Project, ProjectFile, UsageLog, RoleTemplate
 from crypto import decrypt_api_key
 from routes_memory import get_memories_for_employee, get_memories_for_project
@@ -147,8 +153,11 @@ When user provides roadmap markdown, copy it ALL into the content field. The par
 ```
 '''
 
+# Stripped variant computed once; used when the tools addition opens the prompt
+_TOOLS_PROMPT_STRIPPED = TOOLS_SYSTEM_PROMPT_ADDITION.strip()
 
-def compose_instructions(employee: Employee, role_template: RoleTemplate = None) -> str:
+
+def compose_instructions(employee: Employee, template_instructions: str = None) -> str:
     """
     Compose final instructions by merging template + user overrides.
 
@@ -164,9 +173,9 @@ def compose_instructions(employee: Employee, role_template: RoleTemplate = None)
     # Base instructions: prefer employee.instructions (may include template or custom)
     if employee.instructions:
         parts.append(employee.instructions)
-    elif role_template and role_template.instructions:
+    elif template_instructions:
         # Fallback to template if employee has no instructions
-        parts.append(role_template.instructions)
+        parts.append(template_instructions)
 
     # Add user's custom additions if present
     if employee.user_instructions:
@@ -176,6 +185,61 @@ def compose_instructions(employee: Employee, role_template: RoleTemplate = None)
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
+# Composed (pre-variable-substitution) instructions keyed by employee identity
+# and updated_at, so repeat chat turns skip the role-template fetch and string
+# assembly. Volatile {{date}}/{{time}}/{{day}} variables are substituted per
+# request afterwards; entries invalidate when the employee row changes.
+_composed_instructions_cache: dict = {}
+_COMPOSED_CACHE_MAX = 512
+
+# Pre-encoded SSE frame fragments so each yield skips a str->bytes encode
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+_SSE_DONE = b"data: [DONE]\n\n"
+
+# Map friendly Anthropic model names to their API identifiers (built once at import)
+_ANTHROPIC_MODEL_MAP = {
+    "claude-3-opus": "claude-3-opus-20240229",
+    "claude-3-sonnet": "claude-3-sonnet-20240229",
+    "claude-3.5-sonnet": "claude-3-5-sonnet-20241022",
+    "claude-3-haiku": "claude-3-haiku-20240307",
+}
+
+# Context window sizes per model (built once at import)
+_MODEL_CONTEXT_LIMITS = {
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-3.5-turbo": 16385,
+    "claude-3-5-sonnet-latest": 200000,
+    "claude-3-5-haiku-latest": 200000,
+    "claude-3-opus-latest": 200000,
+}
+
+# Compiled once at import; extract_important_artifacts runs these per message
+_RE_SPREADSHEET_ID = re.compile(r'\(spreadsheet_id:\s*([a-zA-Z0-9_-]+)')
+_RE_SHEET_NAMES = re.compile(r'sheets:\s*([^)]+)\)')
+_RE_SPREADSHEET_URL = re.compile(r'https://docs\.google\.com/spreadsheets/d/[^\s\)]+')
+
+# Fenced tool-call blocks (structured JSON emitted by the model)
+_RE_TOOL_CALL = re.compile(r'```tool_call\n(.*?)\n```', re.S)
+
+# Template variables supported in instructions; substituted in one pass
+_RE_INSTRUCTION_VAR = re.compile(r'\{\{(user_name|employee_name|project_name|date|time|day)\}\}')
+
+
+# SDK clients are cached per API key so their underlying httpx connection
+# pools (TCP + TLS) are reused across chat turns instead of rebuilt per request
+@lru_cache(maxsize=128)
+def _openai_client(api_key: str) -> AsyncOpenAI:
+    return AsyncOpenAI(api_key=api_key)
+
+
+@lru_cache(maxsize=128)
+def _anthropic_client(api_key: str) -> AsyncAnthropic:
+    return AsyncAnthropic(api_key=api_key)
+
 
 class ChatMessage(BaseModel):
     role: str  # "user" or "assistant"
@@ -198,25 +262,20 @@ def get_provider_for_model(model: str) -> str:
 
 def replace_instruction_variables(instructions: str, user_name: str, employee_name: str, project_name: str = None) -> str:
     """Replace template variables in instructions with actual values."""
-    if not instructions:
+    if not instructions or "{{" not in instructions:
         return instructions
 
-    from datetime import datetime
-
+    now = datetime.now()
     replacements = {
-        "{{user_name}}": user_name or "User",
-        "{{employee_name}}": employee_name or "Assistant",
-        "{{project_name}}": project_name or "",
-        "{{date}}": datetime.now().strftime("%Y-%m-%d"),
-        "{{time}}": datetime.now().strftime("%H:%M"),
-        "{{day}}": datetime.now().strftime("%A"),
+        "user_name": user_name or "User",
+        "employee_name": employee_name or "Assistant",
+        "project_name": project_name or "",
+        "date": now.strftime("%Y-%m-%d"),
+        "time": now.strftime("%H:%M"),
+        "day": now.strftime("%A"),
     }
 
-    result = instructions
-    for var, value in replacements.items():
-        result = result.replace(var, value)
-
-    return result
+    return _RE_INSTRUCTION_VAR.sub(lambda m: replacements[m.group(1)], instructions)
 
 
 def estimate_tokens(text: str) -> int:
@@ -227,46 +286,53 @@ def estimate_tokens(text: str) -> int:
 
 
 def get_model_context_limit(model: str) -> int:
-    """Get the context limit for a given model."""
-    context_limits = {
-        "gpt-4": 8192,
-        "gpt-4-turbo": 128000,
-        "gpt-4o": 128000,
-        "gpt-4o-mini": 128000,
-        "gpt-3.5-turbo": 16385,
-        "claude-3-5-sonnet-latest": 200000,
-        "claude-3-5-haiku-latest": 200000,
-        "claude-3-opus-latest": 200000,
-    }
-    # Default to 8k for unknown models
-    return context_limits.get(model, 8192)
+    """Get the context limit for a given model. Defaults to 8k for unknown models."""
+    return _MODEL_CONTEXT_LIMITS.get(model, 8192)
 
 
 def extract_important_artifacts(messages: List[dict]) -> str:
     """Extract important artifacts like spreadsheet IDs, URLs, etc. from messages."""
-    import re
     artifacts = []
+    seen = set()
+
+    def add(artifact: str):
+        # Dedupe as we go instead of a second dict.fromkeys pass at the end
+        if artifact not in seen:
+            seen.add(artifact)
+            artifacts.append(artifact)
 
     for m in messages:
         content = m.get("content", "")
 
+        # tool_call fenced blocks are structured JSON - parse each once with
+        # orjson rather than regex-scanning the blob three times
+        if "```tool_call" in content:
+            for block in _RE_TOOL_CALL.finditer(content):
+                try:
+                    call = orjson.loads(block.group(1))
+                except orjson.JSONDecodeError:
+                    continue
+                sid = call.get("spreadsheet_id") if isinstance(call, dict) else None
+                if sid:
+                    add(f"- Google Sheet ID: {sid}")
+                sheets = call.get("sheets") if isinstance(call, dict) else None
+                if isinstance(sheets, list) and sheets:
+                    add(f"- Sheet tabs: {', '.join(str(s) for s in sheets)}")
+            # The regexes below only need to see the free text outside fences
+            content = _RE_TOOL_CALL.sub('', content)
+
         # Extract spreadsheet IDs
-        spreadsheet_matches = re.findall(r'\(spreadsheet_id:\s*([a-zA-Z0-9_-]+)', content)
-        for sid in spreadsheet_matches:
-            artifacts.append(f"- Google Sheet ID: {sid}")
+        for sid in _RE_SPREADSHEET_ID.findall(content):
+            add(f"- Google Sheet ID: {sid}")
 
         # Extract sheet names
-        sheets_matches = re.findall(r'sheets:\s*([^)]+)\)', content)
-        for sheets in sheets_matches:
-            artifacts.append(f"- Sheet tabs: {sheets.strip()}")
+        for sheets in _RE_SHEET_NAMES.findall(content):
+            add(f"- Sheet tabs: {sheets.strip()}")
 
         # Extract URLs
-        url_matches = re.findall(r'https://docs\.google\.com/spreadsheets/d/[^\s\)]+', content)
-        for url in url_matches:
-            artifacts.append(f"- Spreadsheet URL: {url}")
+        for url in _RE_SPREADSHEET_URL.findall(content):
+            add(f"- Spreadsheet URL: {url}")
 
-    # Deduplicate
-    artifacts = list(dict.fromkeys(artifacts))
     return "\n".join(artifacts) if artifacts else ""
 
 
@@ -276,34 +342,39 @@ def summarize_messages_for_context(messages: List[dict], max_tokens: int = 8000,
     Keeps recent messages intact and summarizes older ones.
     Preserves important artifacts like spreadsheet IDs.
     """
-    if not messages:
+    # Keep the last N messages (most recent context)
+    keep_recent = 6  # Keep last 6 messages intact for continuity
+
+    # Short conversations can never be summarized - skip the token math
+    if len(messages) <= keep_recent:
         return messages
 
     # Use model-specific context limit if provided
     if model:
         max_tokens = int(get_model_context_limit(model) * 0.7)  # Use 70% to leave room for response
 
-    # Calculate total tokens
-    total_tokens = sum(estimate_tokens(m.get("content", "")) for m in messages)
+    # Calculate total tokens (inline char count; a function call per message
+    # adds a Python frame for what is just len() // 4)
+    total_chars = sum(len(m.get("content") or "") for m in messages)
+    total_tokens = total_chars // 4
 
     # If under threshold, return as-is
     if total_tokens <= max_tokens:
         return messages
 
-    # Keep the last N messages (most recent context)
-    keep_recent = 6  # Keep last 6 messages intact for continuity
-    if len(messages) <= keep_recent:
-        return messages
-
     older_messages = messages[:-keep_recent]
     recent_messages = messages[-keep_recent:]
 
-    # Extract important artifacts that must be preserved
+    # Extract important artifacts that must be preserved. This deliberately
+    # scans every older message even though only the tail feeds the summary
+    # text: a spreadsheet ID from the start of the conversation must survive
+    # summarization.
     artifacts = extract_important_artifacts(older_messages)
+    older_messages = older_messages[-10:]
 
     # Create a concise summary of older messages
     summary_parts = []
-    for m in older_messages[-10:]:  # Only summarize last 10 older messages
+    for m in older_messages:
         role = m.get("role", "unknown")
         content = m.get("content", "")
         # Get key points only - first 150 chars
@@ -326,64 +397,66 @@ def summarize_messages_for_context(messages: List[dict], max_tokens: int = 8000,
 
 async def stream_openai_response(api_key: str, model: str, system_prompt: str, messages: List[dict]):
     """Stream response from OpenAI API."""
-    from openai import OpenAI
-
-    client = OpenAI(api_key=api_key)
+    client = _openai_client(api_key)
 
-    full_messages = []
+    # Single concat instead of build-then-extend; no copy at all without a system prompt
     if system_prompt:
-        full_messages.append({"role": "system", "content": system_prompt})
-    full_messages.extend(messages)
+        full_messages = [{"role": "system", "content": system_prompt}] + messages
+    else:
+        full_messages = messages
 
     try:
-        stream = client.chat.completions.create(
+        stream = await client.chat.completions.create(
             model=model,
             messages=full_messages,
             stream=True
         )
 
-        for chunk in stream:
+        async for chunk in stream:
             if chunk.choices[0].delta.content:
-                yield f"data: {json.dumps({'content': chunk.choices[0].delta.content})}\n\n"
+                yield _SSE_PREFIX + orjson.dumps({"content": chunk.choices[0].delta.content}) + _SSE_SUFFIX
 
-        yield "data: [DONE]\n\n"
+        yield _SSE_DONE
     except Exception as e:
-        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        yield _SSE_PREFIX + orjson.dumps({"error": str(e)}) + _SSE_SUFFIX
 
 
 async def stream_anthropic_response(api_key: str, model: str, system_prompt: str, messages: List[dict]):
     """Stream response from Anthropic API."""
-    from anthropic import Anthropic
+    client = _anthropic_client(api_key)
 
-    client = Anthropic(api_key=api_key)
-
-    # Map model names to their API identifiers
-    model_map = {
-        "claude-3-opus": "claude-3-opus-20240229",
-        "claude-3-sonnet": "claude-3-sonnet-20240229",
-        "claude-3.5-sonnet": "claude-3-5-sonnet-20241022",
-        "claude-3-haiku": "claude-3-haiku-20240307",
-    }
-    actual_model = model_map.get(model, model)
+    actual_model = _ANTHROPIC_MODEL_MAP.get(model, model)
 
     try:
-        with client.messages.stream(
+        async with client.messages.stream(
             model=actual_model,
             max_tokens=4096,
             system=system_prompt or "You are a helpful assistant.",
             messages=messages
         ) as stream:
-            for text in stream.text_stream:
-                yield f"data: {json.dumps({'content': text})}\n\n"
+            async for text in stream.text_stream:
+                yield _SSE_PREFIX + orjson.dumps({"content": text}) + _SSE_SUFFIX
 
-        yield "data: [DONE]\n\n"
+        yield _SSE_DONE
     except Exception as e:
-        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        yield _SSE_PREFIX + orjson.dumps({"error": str(e)}) + _SSE_SUFFIX
+
+
+# Provider dispatch: (User key column, streaming function, display label).
+# Adding a new provider means one entry here plus a streaming function.
+_PROVIDERS = {
+    "openai": ("openai_api_key", stream_openai_response, "OpenAI"),
+    "anthropic": ("anthropic_api_key", stream_anthropic_response, "Anthropic"),
+}
 
 
-async def log_usage(db: AsyncSession, user_id: UUID, employee_id: UUID, project_id: Optional[UUID],
+async def log_usage(user_id: UUID, employee_id: UUID, project_id: Optional[UUID],
                     model: str, provider: str, system_prompt: str, messages: List[dict]):
-    """Log estimated usage to the database."""
+    """Log estimated usage to the database.
+
+    Runs as a background task once the response has started streaming, so it
+    opens its own session - the request-scoped one is closed by then.
+    """
     input_text = system_prompt or ""
     for m in messages:
         input_text += m.get("content", "")
@@ -400,8 +473,10 @@ async def log_usage(db: AsyncSession, user_id: UUID, employee_id: UUID, project_
         input_tokens=input_tokens,
         output_tokens=output_tokens
     )
-    db.add(usage)
-    await db.commit()
+    session_maker = get_session_maker()
+    async with session_maker() as session:
+        session.add(usage)
+        await session.commit()
 
 
 @router.post("")
@@ -413,19 +488,30 @@ async def chat(
     """Send a chat message to an employee and stream the response."""
     user_id = UUID(user["sub"])
 
-    # Get employee
-    result = await db.execute(
-        select(Employee)
+    # Employee (only the columns the chat path reads) with its role template's
+    # instructions joined in, so no second template round-trip is needed
+    employee_stmt = (
+        select(Employee.id, Employee.name, Employee.model, Employee.instructions,
+               Employee.user_instructions, Employee.role_template_id, Employee.updated_at,
+               RoleTemplate.instructions.label("template_instructions"))
+        .outerjoin(RoleTemplate, RoleTemplate.id == Employee.role_template_id)
         .where(Employee.id == UUID(request.employee_id), Employee.owner_id == user_id)
     )
-    employee = result.scalar_one_or_none()
+
+    # User name, API keys, and Google connection flag in one narrow select
+    user_stmt = (
+        select(User.name, User.openai_api_key, User.anthropic_api_key, User.google_refresh_token)
+        .where(User.id == user_id)
+    )
+
+    # The two lookups are independent - overlap their round-trips
+    employee_result, user_result = await execute_concurrent(employee_stmt, user_stmt)
+    employee = employee_result.one_or_none()
 
     if employee is None:
         raise HTTPException(status_code=404, detail="Employee not found")
 
-    # Get user for API keys
-    result = await db.execute(select(User).where(User.id == user_id))
-    db_user = result.scalar_one_or_none()
+    db_user = user_result.one_or_none()
 
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
@@ -435,21 +521,15 @@ async def chat(
 
     # Determine provider and check for key
     provider = get_provider_for_model(model)
+    key_attr, stream_fn, provider_label = _PROVIDERS[provider]
 
-    if provider == "openai":
-        if not db_user.openai_api_key:
-            raise HTTPException(
-                status_code=status.HTTP_402_PAYMENT_REQUIRED,
-                detail="OpenAI API key required. Please add your API key in Settings."
-            )
-        api_key = decrypt_api_key(db_user.openai_api_key)
-    else:  # anthropic
-        if not db_user.anthropic_api_key:
-            raise HTTPException(
-                status_code=status.HTTP_402_PAYMENT_REQUIRED,
-                detail="Anthropic API key required. Please add your API key in Settings."
-            )
-        api_key = decrypt_api_key(db_user.anthropic_api_key)
+    encrypted_key = getattr(db_user, key_attr)
+    if not encrypted_key:
+        raise HTTPException(
+            status_code=status.HTTP_402_PAYMENT_REQUIRED,
+            detail=f"{provider_label} API key required. Please add your API key in Settings."
+        )
+    api_key = decrypt_api_key(encrypted_key)
 
     if not api_key:
         raise HTTPException(
@@ -457,8 +537,10 @@ async def chat(
             detail="Failed to decrypt API key"
         )
 
-    # Build messages for API and apply summarization for long conversations
-    raw_messages = [{"role": m.role, "content": m.content} for m in request.messages]
+    # Build messages for API and apply summarization for long conversations.
+    # model_dump runs in pydantic-core C code, so the validated payload becomes
+    # plain dicts in one pass instead of a per-message Python rebuild.
+    raw_messages = request.model_dump(include={"messages"})["messages"]
     api_messages = summarize_messages_for_context(raw_messages, model=model)
 
     # Get project details if applicable
@@ -474,19 +556,18 @@ async def chat(
             project_name = project.name
             project_instructions = project.instructions
 
-    # Get role template if employee is based on one
-    role_template = None
-    if employee.role_template_id:
-        result = await db.execute(
-            select(RoleTemplate).where(RoleTemplate.id == employee.role_template_id)
-        )
-        role_template = result.scalar_one_or_none()
-
     # Get memories and build system prompt
     memories = await get_memories_for_employee(db, user_id, employee.id, project_id)
 
-    # Compose instructions from template + user overrides (Step 3: Instruction Composition)
-    composed_instructions = compose_instructions(employee, role_template)
+    # Compose instructions from template + user overrides (Step 3: Instruction Composition).
+    # Cached per (employee, updated_at) so repeat turns skip the template fetch.
+    cache_key = (employee.id, employee.updated_at, employee.role_template_id)
+    composed_instructions = _composed_instructions_cache.get(cache_key)
+    if composed_instructions is None:
+        composed_instructions = compose_instructions(employee, employee.template_instructions)
+        if len(_composed_instructions_cache) >= _COMPOSED_CACHE_MAX:
+            _composed_instructions_cache.clear()
+        _composed_instructions_cache[cache_key] = composed_instructions
 
     # Replace instruction variables with actual values
     base_instructions = replace_instruction_variables(
@@ -495,7 +576,11 @@ async def chat(
         employee_name=employee.name,
         project_name=project_name
     )
-    system_prompt = base_instructions
+    # Accumulate prompt sections in a list and join once at the end; repeated
+    # `+` concatenation re-copies the growing prompt for every section
+    prompt_parts = []
+    if base_instructions:
+        prompt_parts.append(base_instructions)
 
     # Add project-specific instructions if available (conditional instructions)
     if project_instructions:
@@ -505,51 +590,51 @@ async def chat(
             employee_name=employee.name,
             project_name=project_name
         )
-        if system_prompt:
-            system_prompt = system_prompt + "\n\n## Project-Specific Instructions:\n" + project_instruction_section
+        if prompt_parts:
+            prompt_parts.append("\n\n## Project-Specific Instructions:\n" + project_instruction_section)
         else:
-            system_prompt = project_instruction_section
+            prompt_parts.append(project_instruction_section)
 
     if memories:
         memory_section = "\n\n## Important Information to Remember:\n" + "\n".join(f"- {m}" for m in memories)
-        system_prompt = system_prompt + memory_section if system_prompt else memory_section.strip()
+        prompt_parts.append(memory_section if prompt_parts else memory_section.strip())
 
     # Get uploaded files and add to context
     # For project chat, use project files; for DM, use session files
     if project_id:
         result = await db.execute(
-            select(ProjectFile)
+            select(ProjectFile.filename, ProjectFile.content)
             .where(ProjectFile.project_id == project_id, ProjectFile.owner_id == user_id)
         )
-        project_files = result.scalars().all()
+        project_files = result.all()
         if project_files:
-            file_section = "\n\n## Project Files:\n"
-            for f in project_files:
-                file_section += f"\n### {f.filename}\n```\n{f.content}\n```\n"
-            system_prompt = system_prompt + file_section if system_prompt else file_section.strip()
+            file_parts = ["\n\n## Project Files:\n"]
+            file_parts.extend(f"\n### {filename}\n```\n{content}\n```\n" for filename, content in project_files)
+            file_section = "".join(file_parts)
+            prompt_parts.append(file_section if prompt_parts else file_section.strip())
     else:
         files = await get_files_for_context(db, user_id, employee.id)
         if files:
-            file_section = "\n\n## Uploaded Files:\n"
-            for f in files:
-                file_section += f"\n### {f['filename']}\n```\n{f['content']}\n```\n"
-            system_prompt = system_prompt + file_section if system_prompt else file_section.strip()
+            file_parts = ["\n\n## Uploaded Files:\n"]
+            file_parts.extend(f"\n### {f['filename']}\n```\n{f['content']}\n```\n" for f in files)
+            file_section = "".join(file_parts)
+            prompt_parts.append(file_section if prompt_parts else file_section.strip())
 
     # Add Google Sheets tools if user has Drive connected
     if db_user.google_refresh_token:
-        system_prompt = system_prompt + TOOLS_SYSTEM_PROMPT_ADDITION if system_prompt else TOOLS_SYSTEM_PROMPT_ADDITION.strip()
-
-    # Log usage before streaming (estimate based on input)
-    await log_usage(db, user_id, employee.id, project_id, model, provider, system_prompt, api_messages)
-
-    # Stream response
-    if provider == "openai":
-        return StreamingResponse(
-            stream_openai_response(api_key, model, system_prompt, api_messages),
-            media_type="text/event-stream"
-        )
-    else:
-        return StreamingResponse(
-            stream_anthropic_response(api_key, model, system_prompt, api_messages),
-            media_type="text/event-stream"
+        prompt_parts.append(TOOLS_SYSTEM_PROMPT_ADDITION if prompt_parts else _TOOLS_PROMPT_STRIPPED)
+
+    system_prompt = "".join(prompt_parts)
+
+    # Stream response; usage logging runs as a background task after the
+    # stream finishes so its commit round-trip doesn't delay the first token
+    return StreamingResponse(
+        stream_fn(api_key, model, system_prompt, api_messages),
+        media_type="text/event-stream",
+        # Opt out of GZipMiddleware: its streaming mode buffers data in the
+        # compressor, which would hold back SSE deltas
+        headers={"Content-Encoding": "identity"},
+        background=BackgroundTask(
+            log_usage, user_id, employee.id, project_id, model, provider, system_prompt, api_messages
         )
+    )
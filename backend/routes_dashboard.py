@@ -8,8 +8,10 @@ Provides endpoints for the new dashboard-first UX:
 - Team status
 """
 from datetime import datetime
-from typing import Optional, List
+from typing import Literal, Optional, List
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import Request as FastAPIRequest
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc, func
@@ -17,7 +19,7 @@ from sqlalchemy.orm import selectinload
 import json
 
 from auth import require_auth
-from database import get_db
+from database import get_db, execute_concurrent
 from models import User, TeamMember, Request, Deliverable, RequestMessage, Project
 from routes_auth import create_quietdesk_team
 
@@ -72,7 +74,7 @@ class DashboardResponse(BaseModel):
 class CreateRequestBody(BaseModel):
     title: str
     description: str
-    request_type: str  # roadmap, analysis, audit, review, research, custom
+    request_type: Literal["roadmap", "analysis", "audit", "review", "research", "custom"]
     project_id: Optional[str] = None
     product_url: Optional[str] = None
 
@@ -109,7 +111,7 @@ class DeliverableDetailResponse(BaseModel):
 # Dashboard Endpoints
 # ============================================================================
 
-@router.get("/", response_model=DashboardResponse)
+@router.get("/", response_class=ORJSONResponse)
 async def get_dashboard(
     auth_user: dict = Depends(require_auth),
     db: AsyncSession = Depends(get_db)
@@ -136,92 +138,90 @@ async def get_dashboard(
         )
         team_members = team_result.scalars().all()
 
-    # Get active requests (pending or processing)
-    requests_result = await db.execute(
-        select(Request)
+    # Active requests (pending or processing) with project names in one query
+    requests_stmt = (
+        select(Request, Project.name)
+        .outerjoin(Project, Project.id == Request.project_id)
         .where(Request.owner_id == user_id)
         .where(Request.status.in_(["pending", "processing"]))
         .order_by(desc(Request.created_at))
         .limit(10)
     )
-    active_requests = requests_result.scalars().all()
 
-    # Get recent deliverables
-    deliverables_result = await db.execute(
-        select(Deliverable)
-        .join(Request)
+    # Recent deliverables with their request titles in one query
+    deliverables_stmt = (
+        select(Deliverable, Request.title)
+        .join(Request, Request.id == Deliverable.request_id)
         .where(Deliverable.owner_id == user_id)
         .order_by(desc(Deliverable.created_at))
         .limit(10)
     )
-    recent_deliverables = deliverables_result.scalars().all()
 
-    # Get stats
-    total_requests = await db.execute(
-        select(func.count(Request.id)).where(Request.owner_id == user_id)
-    )
-    total_deliverables = await db.execute(
-        select(func.count(Deliverable.id)).where(Deliverable.owner_id == user_id)
-    )
-    completed_requests = await db.execute(
-        select(func.count(Request.id))
+    # Stats: total + completed request counts via conditional aggregation in one scan
+    request_stats_stmt = (
+        select(
+            func.count(Request.id).label("total"),
+            func.count(Request.id).filter(Request.status == "completed").label("completed")
+        )
         .where(Request.owner_id == user_id)
-        .where(Request.status == "completed")
     )
+    total_deliverables_stmt = select(func.count(Deliverable.id)).where(Deliverable.owner_id == user_id)
+
+    # These queries are independent of each other - overlap the round-trips
+    (requests_result, deliverables_result, request_stats_result,
+     total_deliverables) = await execute_concurrent(
+        requests_stmt, deliverables_stmt, request_stats_stmt, total_deliverables_stmt
+    )
+    active_requests = requests_result.all()
+    recent_deliverables = deliverables_result.all()
+    total_requests, completed_requests = request_stats_result.one()
 
-    # Build response
+    # Build response as plain dicts; orjson serializes them (and datetimes)
+    # directly without a Pydantic validation/serialization pass
     team_response = [
-        TeamMemberResponse(
-            id=str(m.id),
-            role=m.role,
-            name=m.name,
-            title=m.title or m.role.replace("_", " ").title(),
-            is_lead=m.is_lead
-        )
+        {
+            "id": str(m.id),
+            "role": m.role,
+            "name": m.name,
+            "title": m.title or m.role.replace("_", " ").title(),
+            "is_lead": m.is_lead
+        }
         for m in team_members
     ]
 
-    active_requests_response = []
-    for r in active_requests:
-        # Get project name if associated
-        project_name = None
-        if r.project_id:
-            proj = await db.execute(select(Project.name).where(Project.id == r.project_id))
-            project_name = proj.scalar_one_or_none()
-
-        active_requests_response.append(RequestSummary(
-            id=str(r.id),
-            title=r.title,
-            request_type=r.request_type,
-            status=r.status,
-            created_at=r.created_at,
-            project_name=project_name
-        ))
-
-    deliverables_response = []
-    for d in recent_deliverables:
-        # Get request title
-        req = await db.execute(select(Request.title).where(Request.id == d.request_id))
-        req_title = req.scalar_one_or_none() or "Unknown"
-
-        deliverables_response.append(DeliverableSummary(
-            id=str(d.id),
-            title=d.title,
-            deliverable_type=d.deliverable_type,
-            created_at=d.created_at,
-            request_title=req_title
-        ))
-
-    return DashboardResponse(
-        team=team_response,
-        active_requests=active_requests_response,
-        recent_deliverables=deliverables_response,
-        stats={
-            "total_requests": total_requests.scalar() or 0,
-            "completed_requests": completed_requests.scalar() or 0,
+    active_requests_response = [
+        {
+            "id": str(r.id),
+            "title": r.title,
+            "request_type": r.request_type,
+            "status": r.status,
+            "created_at": r.created_at,
+            "project_name": project_name
+        }
+        for r, project_name in active_requests
+    ]
+
+    deliverables_response = [
+        {
+            "id": str(d.id),
+            "title": d.title,
+            "deliverable_type": d.deliverable_type,
+            "created_at": d.created_at,
+            "request_title": req_title or "Unknown"
+        }
+        for d, req_title in recent_deliverables
+    ]
+
+    return {
+        "team": team_response,
+        "active_requests": active_requests_response,
+        "recent_deliverables": deliverables_response,
+        "stats": {
+            "total_requests": total_requests or 0,
+            "completed_requests": completed_requests or 0,
             "total_deliverables": total_deliverables.scalar() or 0
         }
-    )
+    }
 
 
 @router.get("/team")
@@ -264,13 +264,8 @@ async def create_request(
     """Submit a new request to the QuietDesk team."""
     user_id = auth_user["sub"]
 
-    # Validate request type
-    valid_types = ["roadmap", "analysis", "audit", "review", "research", "custom"]
-    if body.request_type not in valid_types:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid request_type. Must be one of: {valid_types}"
-        )
+    # request_type validation happens in Pydantic (Literal) and is backed
+    # by a CHECK constraint on the table
 
     # Create the request
     new_request = Request(
@@ -284,7 +279,8 @@ async def create_request(
     )
     db.add(new_request)
     await db.commit()
-    await db.refresh(new_request)
+    # No refresh needed: id/status/created_at are Python-side defaults already
+    # populated on the instance, and the session doesn't expire on commit
 
     return {
         "id": str(new_request.id),
@@ -305,7 +301,13 @@ async def list_requests(
     """List all requests for the user."""
     user_id = auth_user["sub"]
 
-    query = select(Request).where(Request.owner_id == user_id)
+    # Project only the listed columns; description/team_involved can be large
+    query = (
+        select(Request.id, Request.title, Request.request_type, Request.status,
+               Request.created_at, Request.completed_at, Project.name)
+        .outerjoin(Project, Project.id == Request.project_id)
+        .where(Request.owner_id == user_id)
+    )
 
     if status_filter:
         query = query.where(Request.status == status_filter)
@@ -313,26 +315,20 @@ async def list_requests(
     query = query.order_by(desc(Request.created_at)).offset(offset).limit(limit)
 
     result = await db.execute(query)
-    requests = result.scalars().all()
-
-    response = []
-    for r in requests:
-        project_name = None
-        if r.project_id:
-            proj = await db.execute(select(Project.name).where(Project.id == r.project_id))
-            project_name = proj.scalar_one_or_none()
 
-        response.append({
-            "id": str(r.id),
-            "title": r.title,
-            "request_type": r.request_type,
-            "status": r.status,
-            "created_at": r.created_at.isoformat(),
-            "completed_at": r.completed_at.isoformat() if r.completed_at else None,
+    # orjson serializes UUID/datetime values directly
+    return [
+        {
+            "id": req_id,
+            "title": title,
+            "request_type": request_type,
+            "status": req_status,
+            "created_at": created_at,
+            "completed_at": completed_at,
             "project_name": project_name
-        })
-
-    return response
+        }
+        for req_id, title, request_type, req_status, created_at, completed_at, project_name in result.all()
+    ]
 
 
 @router.get("/requests/{request_id}")
@@ -344,29 +340,21 @@ async def get_request(
     """Get details of a specific request."""
     user_id = auth_user["sub"]
 
+    # Deliverables come along via selectinload instead of a separate query
     result = await db.execute(
-        select(Request)
+        select(Request, Project.name)
+        .options(selectinload(Request.deliverables))
+        .outerjoin(Project, Project.id == Request.project_id)
         .where(Request.id == request_id)
         .where(Request.owner_id == user_id)
     )
-    req = result.scalar_one_or_none()
+    row = result.one_or_none()
 
-    if not req:
+    if not row:
         raise HTTPException(status_code=404, detail="Request not found")
 
-    # Get project name
-    project_name = None
-    if req.project_id:
-        proj = await db.execute(select(Project.name).where(Project.id == req.project_id))
-        project_name = proj.scalar_one_or_none()
-
-    # Get deliverables
-    deliverables_result = await db.execute(
-        select(Deliverable)
-        .where(Deliverable.request_id == request_id)
-        .order_by(desc(Deliverable.created_at))
-    )
-    deliverables = deliverables_result.scalars().all()
+    req, project_name = row
+    deliverables = req.deliverables
 
     return {
         "id": str(req.id),
@@ -407,8 +395,10 @@ async def list_deliverables(
     """List all deliverables for the user."""
     user_id = auth_user["sub"]
 
+    # Project only the listed columns; content is a potentially large TEXT blob
     query = (
-        select(Deliverable)
+        select(Deliverable.id, Deliverable.title, Deliverable.deliverable_type,
+               Deliverable.created_at, Deliverable.google_sheet_url, Request.title)
         .join(Request)
         .where(Deliverable.owner_id == user_id)
     )
@@ -419,23 +409,19 @@ async def list_deliverables(
     query = query.order_by(desc(Deliverable.created_at)).offset(offset).limit(limit)
 
     result = await db.execute(query)
-    deliverables = result.scalars().all()
-
-    response = []
-    for d in deliverables:
-        req = await db.execute(select(Request.title).where(Request.id == d.request_id))
-        req_title = req.scalar_one_or_none() or "Unknown"
-
-        response.append({
-            "id": str(d.id),
-            "title": d.title,
-            "deliverable_type": d.deliverable_type,
-            "created_at": d.created_at.isoformat(),
-            "request_title": req_title,
-            "google_sheet_url": d.google_sheet_url
-        })
 
-    return response
+    # orjson serializes UUID/datetime values directly
+    return [
+        {
+            "id": d_id,
+            "title": title,
+            "deliverable_type": d_type,
+            "created_at": created_at,
+            "request_title": req_title or "Unknown",
+            "google_sheet_url": sheet_url
+        }
+        for d_id, title, d_type, created_at, sheet_url, req_title in result.all()
+    ]
 
 
 @router.get("/deliverables/{deliverable_id}")
@@ -479,47 +465,59 @@ async def get_deliverable(
 # Request Types Reference
 # ============================================================================
 
+# Static reference data: built once at import, served with cache headers so
+# browsers and proxies stop re-fetching it on every page load
+_REQUEST_TYPES = [
+    {
+        "type": "roadmap",
+        "name": "Product Roadmap",
+        "description": "Create a product roadmap with phases, features, and priorities",
+        "team_involved": ["product_manager", "technical_advisor"]
+    },
+    {
+        "type": "analysis",
+        "name": "Analysis",
+        "description": "Competitive, market, or technical analysis",
+        "team_involved": ["research_analyst", "product_manager"]
+    },
+    {
+        "type": "audit",
+        "name": "Audit",
+        "description": "Review existing feature or product for issues and improvements",
+        "team_involved": ["qa_engineer", "ux_expert", "technical_advisor"]
+    },
+    {
+        "type": "review",
+        "name": "Review",
+        "description": "Get feedback on an idea, document, or design",
+        "team_involved": ["product_manager", "ux_expert"]
+    },
+    {
+        "type": "research",
+        "name": "Research",
+        "description": "Investigate a topic and gather information",
+        "team_involved": ["research_analyst"]
+    },
+    {
+        "type": "custom",
+        "name": "Custom Request",
+        "description": "Ask anything - Quincy will route to the right team members",
+        "team_involved": []
+    }
+]
+_REQUEST_TYPES_ETAG = '"rt-v1"'
+_REQUEST_TYPES_HEADERS = {
+    "Cache-Control": "public, max-age=86400, immutable",
+    "ETag": _REQUEST_TYPES_ETAG,
+}
+
+
 @router.get("/request-types")
-async def get_request_types():
+async def get_request_types(request: FastAPIRequest):
     """Get available request types with descriptions."""
-    return [
-        {
-            "type": "roadmap",
-            "name": "Product Roadmap",
-            "description": "Create a product roadmap with phases, features, and priorities",
-            "team_involved": ["product_manager", "technical_advisor"]
-        },
-        {
-            "type": "analysis",
-            "name": "Analysis",
-            "description": "Competitive, market, or technical analysis",
-            "team_involved": ["research_analyst", "product_manager"]
-        },
-        {
-            "type": "audit",
-            "name": "Audit",
-            "description": "Review existing feature or product for issues and improvements",
-            "team_involved": ["qa_engineer", "ux_expert", "technical_advisor"]
-        },
-        {
-            "type": "review",
-            "name": "Review",
-            "description": "Get feedback on an idea, document, or design",
-            "team_involved": ["product_manager", "ux_expert"]
-        },
-        {
-            "type": "research",
-            "name": "Research",
-            "description": "Investigate a topic and gather information",
-            "team_involved": ["research_analyst"]
-        },
-        {
-            "type": "custom",
-            "name": "Custom Request",
-            "description": "Ask anything - Quincy will route to the right team members",
-            "team_involved": []
-        }
-    ]
+    if request.headers.get("if-none-match") == _REQUEST_TYPES_ETAG:
+        return Response(status_code=304, headers=_REQUEST_TYPES_HEADERS)
+    return ORJSONResponse(_REQUEST_TYPES, headers=_REQUEST_TYPES_HEADERS)
 
 
 # ============================================================================
@@ -101,7 +101,8 @@ async def create_employee(
     )
     db.add(employee)
     await db.commit()
-    await db.refresh(employee)
+    # All columns are client-supplied or Python-side defaults; skip the
+    # refresh SELECT (session doesn't expire attributes on commit)
 
     return {
         "id": str(employee.id),
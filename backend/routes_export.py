@@ -1,9 +1,15 @@
+import asyncio
+import html
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from uuid import UUID
-from io import BytesIO
 
 from auth import require_auth
 from database import get_db
@@ -11,9 +17,13 @@ from models import Message, Project, Employee
 
 router = APIRouter(prefix="/api/export", tags=["export"])
 
+# reportlab builds are CPU-bound and synchronous; run them in worker
+# processes so a long export doesn't stall the event loop
+_pdf_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+
 
-def generate_pdf_content(title: str, messages: list) -> bytes:
-    """Generate a simple PDF from conversation messages."""
+def generate_pdf_content(title: str, messages: list, output_path: str) -> None:
+    """Generate a simple PDF from conversation messages, written to output_path."""
     try:
         from reportlab.lib.pagesizes import letter
         from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -21,15 +31,15 @@ def generate_pdf_content(title: str, messages: list) -> bytes:
         from reportlab.lib.enums import TA_LEFT
         from reportlab.lib.colors import HexColor
     except ImportError:
-        # Fallback if reportlab not installed - return plain text as PDF-like format
-        content = f"# {title}\n\n"
-        for m in messages:
-            role = "You" if m["role"] == "user" else "Assistant"
-            content += f"**{role}** ({m['created_at']}):\n{m['content']}\n\n---\n\n"
-        return content.encode('utf-8')
+        # Fallback if reportlab not installed - write plain text as PDF-like format
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(f"# {title}\n\n")
+            for m in messages:
+                role = "You" if m["role"] == "user" else "Assistant"
+                f.write(f"**{role}** ({m['created_at']}):\n{m['content']}\n\n---\n\n")
+        return
 
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=50, bottomMargin=50)
+    doc = SimpleDocTemplate(output_path, pagesize=letter, topMargin=50, bottomMargin=50)
 
     styles = getSampleStyleSheet()
     title_style = styles['Title']
@@ -65,32 +75,84 @@ def generate_pdf_content(title: str, messages: list) -> bytes:
         textColor=HexColor('#666666'),
     )
 
-    story = []
-    story.append(Paragraph(title, title_style))
-    story.append(Spacer(1, 20))
-
-    for m in messages:
-        role_label = "You" if m["role"] == "user" else "Assistant"
-        style = user_style if m["role"] == "user" else assistant_style
+    # html.escape does the &/</> escaping in a single C pass instead of
+    # three replace() passes over each message body
+    story = [Paragraph(title, title_style), Spacer(1, 20)]
+    story.extend(chain.from_iterable(
+        (
+            Paragraph(
+                f"<b>{'You' if m['role'] == 'user' else 'Assistant'}</b> - {m['created_at']}",
+                meta_style
+            ),
+            Paragraph(
+                html.escape(m["content"], quote=False).replace('\n', '<br/>'),
+                user_style if m["role"] == "user" else assistant_style
+            ),
+            Spacer(1, 10),
+        )
+        for m in messages
+    ))
 
-        # Add role and timestamp
-        story.append(Paragraph(f"<b>{role_label}</b> - {m['created_at']}", meta_style))
+    doc.build(story)
 
-        # Clean content for PDF (escape special chars)
-        content = m["content"]
-        content = content.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-        content = content.replace('\n', '<br/>')
 
-        story.append(Paragraph(content, style))
-        story.append(Spacer(1, 10))
+def _stream_and_remove(path: str, chunk_size: int = 64 * 1024):
+    """Yield a rendered file in chunks, deleting it once fully sent."""
+    try:
+        with open(path, 'rb') as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+    finally:
+        os.unlink(path)
+
+
+async def _fetch_message_data(db: AsyncSession, stmt) -> list:
+    """Stream message rows in server-side batches into the dicts the PDF worker consumes.
+
+    Avoids materializing every Message ORM object up front; only the three
+    projected columns per row are held, in one flat list.
+    """
+    message_data = []
+    result = await db.stream(stmt.execution_options(yield_per=200))
+    async for role, content, created_at in result:
+        message_data.append({
+            "role": role,
+            "content": content,
+            "created_at": created_at.strftime("%Y-%m-%d %H:%M") if created_at else ""
+        })
+    return message_data
+
+
+async def _render_pdf_response(title: str, message_data: list, filename: str) -> StreamingResponse:
+    """Render a PDF in the worker pool and stream it back chunk by chunk.
+
+    The worker writes to a temp file and the response streams from it, so
+    the handler never holds the whole document in memory.
+    """
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    try:
+        await asyncio.get_running_loop().run_in_executor(
+            _pdf_pool, generate_pdf_content, title, message_data, path
+        )
+    except BaseException:
+        os.unlink(path)
+        raise
 
-    doc.build(story)
-    return buffer.getvalue()
+    return StreamingResponse(
+        _stream_and_remove(path),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            # PDFs are already compressed; keep GZipMiddleware off this stream
+            "Content-Encoding": "identity",
+        }
+    )
 
 
 @router.get("/project/{project_id}/pdf")
 async def export_project_to_pdf(
-    project_id: str,
+    project_id: UUID,
     user: dict = Depends(require_auth),
     db: AsyncSession = Depends(get_db)
 ):
@@ -99,43 +161,28 @@ async def export_project_to_pdf(
 
     # Verify project ownership
     result = await db.execute(
-        select(Project).where(Project.id == UUID(project_id), Project.owner_id == user_id)
+        select(Project).where(Project.id == project_id, Project.owner_id == user_id)
     )
     project = result.scalar_one_or_none()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
     # Get messages
-    result = await db.execute(
-        select(Message)
-        .where(Message.project_id == UUID(project_id), Message.owner_id == user_id)
+    message_data = await _fetch_message_data(
+        db,
+        select(Message.role, Message.content, Message.created_at)
+        .where(Message.project_id == project_id, Message.owner_id == user_id)
         .order_by(Message.created_at.asc())
     )
-    messages = result.scalars().all()
 
-    message_data = [
-        {
-            "role": m.role,
-            "content": m.content,
-            "created_at": m.created_at.strftime("%Y-%m-%d %H:%M") if m.created_at else ""
-        }
-        for m in messages
-    ]
-
-    pdf_bytes = generate_pdf_content(f"Project: {project.name}", message_data)
-
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f'attachment; filename="{project.name}.pdf"'
-        }
+    return await _render_pdf_response(
+        f"Project: {project.name}", message_data, f"{project.name}.pdf"
     )
 
 
 @router.get("/dm/{employee_id}/pdf")
 async def export_dm_to_pdf(
-    employee_id: str,
+    employee_id: UUID,
     user: dict = Depends(require_auth),
     db: AsyncSession = Depends(get_db)
 ):
@@ -144,39 +191,24 @@ async def export_dm_to_pdf(
 
     # Verify employee ownership
     result = await db.execute(
-        select(Employee).where(Employee.id == UUID(employee_id), Employee.owner_id == user_id)
+        select(Employee).where(Employee.id == employee_id, Employee.owner_id == user_id)
     )
     employee = result.scalar_one_or_none()
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
 
     # Get DM messages
-    result = await db.execute(
-        select(Message)
+    message_data = await _fetch_message_data(
+        db,
+        select(Message.role, Message.content, Message.created_at)
         .where(
-            Message.employee_id == UUID(employee_id),
+            Message.employee_id == employee_id,
             Message.owner_id == user_id,
             Message.project_id.is_(None)
         )
         .order_by(Message.created_at.asc())
     )
-    messages = result.scalars().all()
 
-    message_data = [
-        {
-            "role": m.role,
-            "content": m.content,
-            "created_at": m.created_at.strftime("%Y-%m-%d %H:%M") if m.created_at else ""
-        }
-        for m in messages
-    ]
-
-    pdf_bytes = generate_pdf_content(f"Conversation with {employee.name}", message_data)
-
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f'attachment; filename="{employee.name}_conversation.pdf"'
-        }
+    return await _render_pdf_response(
+        f"Conversation with {employee.name}", message_data, f"{employee.name}_conversation.pdf"
     )
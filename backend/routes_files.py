@@ -1,7 +1,9 @@
+import os
+
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, delete, func
 from typing import List
 from uuid import UUID
 
@@ -12,32 +14,36 @@ from models import DMFile, Employee
 router = APIRouter(prefix="/api/files", tags=["files"])
 
 # Allowed file types and size limits
-ALLOWED_EXTENSIONS = {'.txt', '.md', '.json', '.csv', '.py', '.js', '.ts', '.jsx', '.tsx', '.html', '.css', '.xml', '.yaml', '.yml', '.log', '.sql'}
+ALLOWED_EXTENSIONS = frozenset({'.txt', '.md', '.json', '.csv', '.py', '.js', '.ts', '.jsx', '.tsx', '.html', '.css', '.xml', '.yaml', '.yml', '.log', '.sql'})
 MAX_FILE_SIZE = 100 * 1024  # 100KB per file
 MAX_FILES_PER_DM = 10
 
 
 def is_allowed_file(filename: str) -> bool:
-    return any(filename.lower().endswith(ext) for ext in ALLOWED_EXTENSIONS)
+    return os.path.splitext(filename)[1].lower() in ALLOWED_EXTENSIONS
 
 
 @router.post("/upload/{employee_id}")
 async def upload_file(
-    employee_id: str,
+    employee_id: UUID,
     file: UploadFile = File(...),
     user: dict = Depends(require_auth),
     db: AsyncSession = Depends(get_db)
 ):
     """Upload a file for a DM conversation. Files are persisted to the database."""
     user_id = UUID(user["sub"])
-    emp_id = UUID(employee_id)
 
-    # Verify employee belongs to user
+    # Verify employee ownership and count existing files in one round-trip
     result = await db.execute(
-        select(Employee).where(Employee.id == emp_id, Employee.owner_id == user_id)
+        select(Employee.id, func.count(DMFile.id))
+        .outerjoin(DMFile, (DMFile.employee_id == Employee.id) & (DMFile.owner_id == user_id))
+        .where(Employee.id == employee_id, Employee.owner_id == user_id)
+        .group_by(Employee.id)
     )
-    if result.scalar_one_or_none() is None:
+    row = result.one_or_none()
+    if row is None:
         raise HTTPException(status_code=404, detail="Employee not found")
+    _, file_count = row
 
     # Validate file extension
     if not file.filename or not is_allowed_file(file.filename):
@@ -46,22 +52,27 @@ async def upload_file(
             detail=f"File type not allowed. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
         )
 
-    # Read file content
-    content = await file.read()
-
-    # Validate file size
-    if len(content) > MAX_FILE_SIZE:
+    # Reject obvious overshoot before reading anything
+    if file.size is not None and file.size > MAX_FILE_SIZE:
         raise HTTPException(
             status_code=400,
             detail=f"File too large. Maximum size: {MAX_FILE_SIZE // 1024}KB"
         )
 
+    # Read in chunks and bail as soon as the limit is crossed, instead of
+    # buffering an arbitrarily large body before the size check
+    buf = bytearray()
+    while chunk := await file.read(64 * 1024):
+        buf.extend(chunk)
+        if len(buf) > MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File too large. Maximum size: {MAX_FILE_SIZE // 1024}KB"
+            )
+    content = bytes(buf)
+
     # Check file count limit
-    result = await db.execute(
-        select(DMFile).where(DMFile.employee_id == emp_id, DMFile.owner_id == user_id)
-    )
-    existing_files = result.scalars().all()
-    if len(existing_files) >= MAX_FILES_PER_DM:
+    if file_count >= MAX_FILES_PER_DM:
         raise HTTPException(
             status_code=400,
             detail=f"Maximum {MAX_FILES_PER_DM} files per conversation"
@@ -78,7 +89,7 @@ async def upload_file(
 
     # Store file in database
     dm_file = DMFile(
-        employee_id=emp_id,
+        employee_id=employee_id,
         owner_id=user_id,
         filename=file.filename,
         content=text_content,
@@ -86,7 +97,7 @@ async def upload_file(
     )
     db.add(dm_file)
     await db.commit()
-    await db.refresh(dm_file)
+    # id is a Python-side uuid4 default, so no refresh round trip is needed
 
     return {
         "id": str(dm_file.id),
@@ -98,17 +109,16 @@ async def upload_file(
 
 @router.get("/{employee_id}")
 async def list_files(
-    employee_id: str,
+    employee_id: UUID,
     user: dict = Depends(require_auth),
     db: AsyncSession = Depends(get_db)
 ) -> List[dict]:
     """List files uploaded for a DM conversation."""
     user_id = UUID(user["sub"])
-    emp_id = UUID(employee_id)
 
     result = await db.execute(
         select(DMFile)
-        .where(DMFile.employee_id == emp_id, DMFile.owner_id == user_id)
+        .where(DMFile.employee_id == employee_id, DMFile.owner_id == user_id)
         .order_by(DMFile.created_at)
     )
     files = result.scalars().all()
@@ -118,8 +128,8 @@ async def list_files(
 
 @router.get("/{employee_id}/{file_id}/download")
 async def download_file(
-    employee_id: str,
-    file_id: str,
+    employee_id: UUID,
+    file_id: UUID,
     user: dict = Depends(require_auth),
     db: AsyncSession = Depends(get_db)
 ):
@@ -128,7 +138,7 @@ async def download_file(
 
     result = await db.execute(
         select(DMFile)
-        .where(DMFile.id == UUID(file_id), DMFile.owner_id == user_id)
+        .where(DMFile.id == file_id, DMFile.owner_id == user_id)
     )
     dm_file = result.scalar_one_or_none()
 
@@ -159,8 +169,8 @@ async def download_file(
 
 @router.delete("/{employee_id}/{file_id}")
 async def delete_file(
-    employee_id: str,
-    file_id: str,
+    employee_id: UUID,
+    file_id: UUID,
     user: dict = Depends(require_auth),
     db: AsyncSession = Depends(get_db)
 ):
@@ -169,7 +179,7 @@ async def delete_file(
 
     result = await db.execute(
         select(DMFile)
-        .where(DMFile.id == UUID(file_id), DMFile.owner_id == user_id)
+        .where(DMFile.id == file_id, DMFile.owner_id == user_id)
     )
     dm_file = result.scalar_one_or_none()
 
@@ -184,22 +194,19 @@ async def delete_file(
 
 @router.delete("/{employee_id}")
 async def clear_files(
-    employee_id: str,
+    employee_id: UUID,
     user: dict = Depends(require_auth),
     db: AsyncSession = Depends(get_db)
 ):
     """Clear all files for a DM conversation."""
     user_id = UUID(user["sub"])
-    emp_id = UUID(employee_id)
 
-    result = await db.execute(
-        select(DMFile)
-        .where(DMFile.employee_id == emp_id, DMFile.owner_id == user_id)
+    # One bulk DELETE instead of a SELECT plus one DELETE per row
+    await db.execute(
+        delete(DMFile)
+        .where(DMFile.employee_id == employee_id, DMFile.owner_id == user_id)
+        .execution_options(synchronize_session=False)
     )
-    files = result.scalars().all()
-
-    for f in files:
-        await db.delete(f)
     await db.commit()
 
     return {"status": "ok"}
@@ -208,10 +215,9 @@ async def clear_files(
 async def get_files_for_context(db: AsyncSession, user_id: UUID, employee_id: UUID) -> List[dict]:
     """Get file contents to include in chat context."""
     result = await db.execute(
-        select(DMFile)
+        select(DMFile.filename, DMFile.content)
         .where(DMFile.employee_id == employee_id, DMFile.owner_id == user_id)
         .order_by(DMFile.created_at)
     )
-    files = result.scalars().all()
 
-    return [{"filename": f.filename, "content": f.content} for f in files]
+    return [{"filename": filename, "content": content} for filename, content in result.all()]
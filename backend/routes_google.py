@@ -8,12 +8,20 @@ from typing import Optional, List, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
+import asyncio
+import hashlib
 import httpx
+import orjson
+import random
 import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from operator import attrgetter
 
 from auth import require_auth, refresh_google_token
-from database import get_db
+from database import get_db, get_session_maker
 from models import User
 from crypto import decrypt_api_key, encrypt_api_key
 
@@ -22,6 +30,150 @@ router = APIRouter(prefix="/api/google", tags=["google"])
 SHEETS_API_BASE = "https://sheets.googleapis.com/v4/spreadsheets"
 DRIVE_API_BASE = "https://www.googleapis.com/drive/v3/files"
 
+# One shared client for all Google API calls: pooled, kept-alive connections
+# avoid a fresh TCP+TLS handshake to googleapis.com on every request
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared httpx client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            # HTTP/2 multiplexes concurrent Sheets calls over one TLS
+            # connection instead of serializing on separate sockets
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=50,
+                # Sheets traffic is bursty; keep idle connections warm well
+                # past the default 5s so polls reuse them
+                keepalive_expiry=300.0
+            ),
+            timeout=httpx.Timeout(30.0, connect=5.0)
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared client; called on application shutdown."""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+
+
+# Transient upstream statuses worth retrying; Sheets 429s and 503s
+# usually clear within seconds
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_MAX_RETRIES = 3
+
+
+async def _request_with_retry(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+    """Issue a request, retrying transient Google errors.
+
+    Exponential backoff with jitter, honoring Retry-After when present.
+    Only use for idempotent calls (retrying a plain append can duplicate
+    rows).
+    """
+    response = await client.request(method, url, **kwargs)
+    for attempt in range(_MAX_RETRIES):
+        if response.status_code not in _RETRY_STATUSES:
+            break
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            delay = min(float(retry_after), 16.0)
+        else:
+            delay = min(2 ** attempt + random.random(), 16.0)
+        await asyncio.sleep(delay)
+        response = await client.request(method, url, **kwargs)
+    return response
+
+
+def _google_error(response: httpx.Response, action: str) -> HTTPException:
+    """Build the HTTPException for a failed Google API call.
+
+    Google error bodies are JSON but we only relay them as an opaque
+    detail string, so skip parsing and cap the size - quota errors can
+    carry multi-KB payloads.
+    """
+    return HTTPException(
+        status_code=response.status_code,
+        detail=f"{action}: {response.text[:2048]}"
+    )
+
+
+class _TokenBucket:
+    """Minimal async token bucket: ``rate`` calls per ``period`` seconds."""
+
+    def __init__(self, rate: int = 60, period: float = 60.0):
+        self.capacity = rate
+        self.tokens = float(rate)
+        self.fill_rate = rate / period
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.fill_rate)
+
+
+# Google enforces a per-user Sheets quota (~60 requests/min). Shape our
+# outgoing traffic per user so bursts queue here briefly instead of
+# 429-storming Google and then sitting through retry backoff.
+_sheets_limiters: Dict[str, _TokenBucket] = defaultdict(_TokenBucket)
+
+
+async def _sheets_response(
+    auth_user: dict,
+    db: AsyncSession,
+    method: str,
+    url: str,
+    action: str,
+    *,
+    retry: bool = True,
+    headers: Optional[dict] = None,
+    not_modified_ok: bool = False,
+    **kwargs
+) -> httpx.Response:
+    """Issue one outbound Google API call with the shared hot-path setup.
+
+    Resolves cached auth headers (unless the caller pre-built conditional
+    ones), rate-limits per user, sends on the shared client with retries
+    when the call is safe to replay, and raises _google_error on failure.
+    ``not_modified_ok`` lets conditional GETs see their 304.
+    """
+    if headers is None:
+        headers = await get_google_headers(auth_user, db)
+    await _sheets_limiters[auth_user["sub"]].acquire()
+    client = get_http_client()
+    if retry:
+        response = await _request_with_retry(client, method, url, headers=headers, **kwargs)
+    else:
+        response = await client.request(method, url, headers=headers, **kwargs)
+    if response.status_code == 200 or (not_modified_ok and response.status_code == 304):
+        return response
+    raise _google_error(response, action)
+
+
+async def _sheets_call(
+    auth_user: dict,
+    db: AsyncSession,
+    method: str,
+    url: str,
+    action: str,
+    **kwargs
+) -> dict:
+    """_sheets_response plus body parsing; handlers shrink to call + shape."""
+    response = await _sheets_response(auth_user, db, method, url, action, **kwargs)
+    return orjson.loads(response.content)
+
 
 class CreateSheetRequest(BaseModel):
     title: str
@@ -45,38 +197,282 @@ class ReadSheetRequest(BaseModel):
     range: str
 
 
-async def get_valid_google_token(user: User, db: AsyncSession) -> str:
-    """Get a valid Google access token, refreshing if needed."""
+class BatchReadRequest(BaseModel):
+    spreadsheet_id: str
+    ranges: List[str]  # e.g., ["Sheet1!A1:B10", "Sheet2!A:A"]
+
+
+class BatchUpdateData(BaseModel):
+    range: str
+    values: List[List[str]]
+
+
+class BatchUpdateRequest(BaseModel):
+    spreadsheet_id: str
+    data: List[BatchUpdateData]
+
+
+# UI polling hits the read/info endpoints repeatedly while the sheet is
+# unchanged; serve repeats from a short-TTL cache instead of a Google
+# round trip. Writes through update/append/batch-update invalidate the
+# entries for that spreadsheet.
+_READ_CACHE_TTL = 10.0   # seconds; sheet values
+_INFO_CACHE_TTL = 60.0   # seconds; sheet metadata
+_SHEET_CACHE_MAX = 4096
+# (user_id, spreadsheet_id, range) / (user_id, spreadsheet_id)
+#   -> (expires_monotonic, payload, etag)
+_read_cache: Dict[tuple, tuple] = {}
+_info_cache: Dict[tuple, tuple] = {}
+
+
+def _sheet_cache_get(cache: Dict[tuple, tuple], key: tuple):
+    entry = cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+
+def _sheet_cache_put(cache: Dict[tuple, tuple], key: tuple, payload, ttl: float,
+                     etag: Optional[str] = None) -> None:
+    if len(cache) >= _SHEET_CACHE_MAX:
+        cache.clear()
+    cache[key] = (time.monotonic() + ttl, payload, etag)
+
+
+def _conditional_headers(cache: Dict[tuple, tuple], key: tuple, headers: dict) -> dict:
+    """Add If-None-Match from an expired cache entry, if it carried an ETag.
+
+    Expired entries are kept around precisely so the next fetch can be a
+    conditional GET: a 304 costs Google nothing to produce and lets us
+    re-serve the cached payload for another TTL window.
+    """
+    entry = cache.get(key)
+    if entry and entry[2]:
+        headers = dict(headers)
+        headers["If-None-Match"] = entry[2]
+    return headers
+
+
+def _revalidate_sheet_cache(cache: Dict[tuple, tuple], key: tuple, ttl: float):
+    """Re-arm an expired entry after a 304 and return its payload.
+
+    Returns None if the entry was evicted while the conditional GET was in
+    flight (overflow clear, or a concurrent write invalidating the
+    spreadsheet); the caller should fall back to an unconditional fetch.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    cache[key] = (time.monotonic() + ttl, entry[1], entry[2])
+    return entry[1]
+
+
+def _invalidate_sheet_cache(user_id: str, spreadsheet_id: str) -> None:
+    """Drop cached reads/metadata for a spreadsheet after a write to it."""
+    for cache in (_read_cache, _info_cache):
+        stale = [k for k in cache if k[0] == user_id and k[1] == spreadsheet_id]
+        for key in stale:
+            del cache[key]
+
+
+# Decrypted access tokens cached per user: Fernet decrypt re-derives the
+# key on every call, so skip it while the stored token is still valid.
+# Entries: user_id (str) -> (plaintext_token, expires_at, headers)
+_token_cache: Dict[str, tuple] = {}
+
+
+def _make_cache_entry(token: str, expires_at: datetime) -> tuple:
+    """Build a token-cache entry, including the ready-to-send headers.
+
+    The header dict is constructed once per token validity window instead
+    of once per outbound call.
+    """
+    return (
+        token,
+        expires_at,
+        {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    )
+
+
+# Don't serve or return tokens within 5 minutes of expiry
+_TOKEN_EXPIRY_MARGIN = timedelta(minutes=5)
+
+# Single-flight refresh: when a token expires under load, only one
+# coroutine talks to Google's OAuth endpoint; the rest wait on its result
+_refresh_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+# Start refreshing in the background once a served token has less than
+# this long to live, so the OAuth round trip never lands on a request
+_PROACTIVE_REFRESH_WINDOW = timedelta(minutes=10)
+
+
+def _maybe_schedule_refresh(user_id: str, expires_at: datetime) -> None:
+    """Kick off a background token refresh when expiry is approaching."""
+    if expires_at - datetime.utcnow() >= _PROACTIVE_REFRESH_WINDOW:
+        return
+    if _refresh_locks[user_id].locked():
+        # A refresh is already in flight
+        return
+    asyncio.create_task(_background_refresh(user_id))
+
+
+async def _background_refresh(user_id: str) -> None:
+    """Refresh a user's token off the request path, on its own session."""
+    session_maker = get_session_maker()
+    if session_maker is None:
+        return
+    try:
+        async with _refresh_locks[user_id]:
+            cached = _token_cache.get(user_id)
+            if cached and cached[1] - datetime.utcnow() >= _PROACTIVE_REFRESH_WINDOW:
+                return  # someone else already refreshed
+
+            async with session_maker() as session:
+                user = await _load_oauth_user(session, {"sub": user_id})
+                refresh_token = decrypt_api_key(user.google_refresh_token)
+
+            new_tokens = await refresh_google_token(refresh_token)
+            expires_at = datetime.utcnow() + timedelta(seconds=new_tokens["expires_in"])
+            _token_cache[user_id] = _make_cache_entry(new_tokens["access_token"], expires_at)
+            await _persist_refreshed_token(
+                user.id, encrypt_api_key(new_tokens["access_token"]), expires_at
+            )
+    except Exception:
+        # Best effort: if the proactive refresh fails, the request path
+        # still refreshes inline once the 5-minute margin is reached
+        pass
+
+
+async def _persist_refreshed_token(user_id, encrypted_token: str, expires_at: datetime) -> None:
+    """Write refreshed token columns on a dedicated short-lived session.
+
+    Runs off the request path so the Sheets call never waits on the
+    commit; the in-process cache is the source of truth until it lands.
+    """
+    session_maker = get_session_maker()
+    if session_maker is None:
+        return
+    try:
+        async with session_maker() as session:
+            await session.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(
+                    google_access_token=encrypted_token,
+                    google_token_expires_at=expires_at
+                )
+            )
+            await session.commit()
+    except Exception:
+        # The cache already holds the new token; worst case it is
+        # refreshed again after a process restart
+        pass
+
+
+def invalidate_google_token(user_id) -> None:
+    """Drop a cached token, e.g. after Google rejects it with a 401."""
+    _token_cache.pop(str(user_id), None)
+
+
+async def _load_oauth_user(db: AsyncSession, auth_user: dict):
+    """Load just the OAuth columns for the authed user.
+
+    The handlers here only ever read these four fields; selecting them as a
+    tuple skips hydrating the full User row (encrypted API keys and all).
+    """
+    result = await db.execute(
+        select(User.id, User.google_refresh_token, User.google_access_token,
+               User.google_token_expires_at)
+        .where(User.id == auth_user["sub"])
+    )
+    user = result.one_or_none()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
+async def get_valid_google_token(user, db: AsyncSession) -> str:
+    """Get a valid Google access token, refreshing if needed.
+
+    ``user`` is the OAuth-column row from _load_oauth_user.
+    """
     if not user.google_refresh_token:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No Google account connected. Please log out and log in again to grant Google Drive access."
         )
 
-    # Check if token is expired or about to expire (within 5 minutes)
     now = datetime.utcnow()
-    if user.google_token_expires_at and user.google_token_expires_at > now + timedelta(minutes=5):
+    cache_key = str(user.id)
+
+    cached = _token_cache.get(cache_key)
+    if cached and cached[1] > now + _TOKEN_EXPIRY_MARGIN:
+        return cached[0]
+
+    # Check if token is expired or about to expire (within 5 minutes)
+    if user.google_token_expires_at and user.google_token_expires_at > now + _TOKEN_EXPIRY_MARGIN:
         # Token is still valid
-        return decrypt_api_key(user.google_access_token)
+        token = decrypt_api_key(user.google_access_token)
+        _token_cache[cache_key] = _make_cache_entry(token, user.google_token_expires_at)
+        return token
 
     # Token expired or expiring soon, refresh it
     try:
-        refresh_token = decrypt_api_key(user.google_refresh_token)
-        new_tokens = await refresh_google_token(refresh_token)
-
-        # Update stored tokens
-        user.google_access_token = encrypt_api_key(new_tokens["access_token"])
-        user.google_token_expires_at = now + timedelta(seconds=new_tokens["expires_in"])
-        await db.commit()
-
-        return new_tokens["access_token"]
+        async with _refresh_locks[cache_key]:
+            # Another waiter may have refreshed while we queued on the lock
+            cached = _token_cache.get(cache_key)
+            if cached and cached[1] > datetime.utcnow() + _TOKEN_EXPIRY_MARGIN:
+                return cached[0]
+
+            refresh_token = decrypt_api_key(user.google_refresh_token)
+            new_tokens = await refresh_google_token(refresh_token)
+
+            # Persist the new token off the request path; the cache entry
+            # is what subsequent calls read
+            expires_at = datetime.utcnow() + timedelta(seconds=new_tokens["expires_in"])
+            _token_cache[cache_key] = _make_cache_entry(new_tokens["access_token"], expires_at)
+            asyncio.create_task(_persist_refreshed_token(
+                user.id, encrypt_api_key(new_tokens["access_token"]), expires_at
+            ))
+            return new_tokens["access_token"]
     except Exception as e:
+        # Don't leave a stale entry behind; the next attempt should go
+        # through the full decrypt/refresh path
+        invalidate_google_token(cache_key)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Failed to refresh Google token: {str(e)}. Please log out and log in again."
         )
 
 
+async def get_google_access_token(auth_user: dict, db: AsyncSession) -> str:
+    """Resolve a Google access token straight from the auth context.
+
+    Fast path: a cached, still-valid token means no DB query at all - the
+    JWT subject is the cache key. Only on a miss (cold start, or the token
+    nearing expiry) are the OAuth columns loaded and the refresh logic run.
+    """
+    cached = _token_cache.get(auth_user["sub"])
+    if cached and cached[1] > datetime.utcnow() + _TOKEN_EXPIRY_MARGIN:
+        _maybe_schedule_refresh(auth_user["sub"], cached[1])
+        return cached[0]
+
+    user = await _load_oauth_user(db, auth_user)
+    return await get_valid_google_token(user, db)
+
+
+async def get_google_headers(auth_user: dict, db: AsyncSession) -> dict:
+    """Ready-to-send auth headers for Sheets calls, cached alongside the token."""
+    cached = _token_cache.get(auth_user["sub"])
+    if cached and cached[1] > datetime.utcnow() + _TOKEN_EXPIRY_MARGIN:
+        _maybe_schedule_refresh(auth_user["sub"], cached[1])
+        return cached[2]
+
+    user = await _load_oauth_user(db, auth_user)
+    await get_valid_google_token(user, db)
+    return _token_cache[str(user.id)][2]
+
+
 @router.post("/sheets/create")
 async def create_sheet(
     request: CreateSheetRequest,
@@ -87,14 +483,6 @@ async def create_sheet(
 
     Returns the spreadsheet ID and URL.
     """
-    # Get user from database
-    result = await db.execute(select(User).where(User.id == auth_user["sub"]))
-    user = result.scalar_one_or_none()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    access_token = await get_valid_google_token(user, db)
-
     # Build request body
     body = {
         "properties": {
@@ -108,41 +496,30 @@ async def create_sheet(
             {"properties": {"title": name}} for name in request.sheets
         ]
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            SHEETS_API_BASE,
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json"
-            },
-            json=body
-        )
-
-        if response.status_code != 200:
-            error_detail = response.json() if response.headers.get("content-type", "").startswith("application/json") else response.text
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Failed to create Google Sheet: {error_detail}"
-            )
-
-        data = response.json()
-        spreadsheet_id = data["spreadsheetId"]
-        spreadsheet_url = data["spreadsheetUrl"]
-
-        # Extract actual sheet names from response
-        sheet_names = [
-            s.get("properties", {}).get("title", "Sheet1")
-            for s in data.get("sheets", [])
-        ]
-        if not sheet_names:
-            sheet_names = ["Sheet1"]
+    # retry=False: replaying a create that actually landed leaves duplicate
+    # spreadsheets in the user's Drive
+    data = await _sheets_call(
+        auth_user, db, "POST", SHEETS_API_BASE, "Failed to create Google Sheet",
+        retry=False,
+        content=orjson.dumps(body)
+    )
+    spreadsheet_id = data["spreadsheetId"]
+    spreadsheet_url = data["spreadsheetUrl"]
+
+    # Extract actual sheet names from response
+    sheet_names = [
+        s.get("properties", {}).get("title", "Sheet1")
+        for s in data.get("sheets", [])
+    ]
+    if not sheet_names:
+        sheet_names = ["Sheet1"]
 
-        return {
-            "spreadsheet_id": spreadsheet_id,
-            "url": spreadsheet_url,
-            "title": request.title,
-            "sheets": sheet_names
-        }
+    return {
+        "spreadsheet_id": spreadsheet_id,
+        "url": spreadsheet_url,
+        "title": request.title,
+        "sheets": sheet_names
+    }
 
 
 @router.post("/sheets/update")
@@ -155,39 +532,21 @@ async def update_sheet(
 
     Uses valueInputOption=USER_ENTERED so formulas and formats are parsed.
     """
-    result = await db.execute(select(User).where(User.id == auth_user["sub"]))
-    user = result.scalar_one_or_none()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    access_token = await get_valid_google_token(user, db)
+    data = await _sheets_call(
+        auth_user, db, "PUT",
+        f"{SHEETS_API_BASE}/{request.spreadsheet_id}/values/{request.range}",
+        "Failed to update Google Sheet",
+        params={"valueInputOption": "USER_ENTERED"},
+        content=orjson.dumps({"values": request.values})
+    )
+    _invalidate_sheet_cache(auth_user["sub"], request.spreadsheet_id)
 
-    async with httpx.AsyncClient() as client:
-        url = f"{SHEETS_API_BASE}/{request.spreadsheet_id}/values/{request.range}"
-        response = await client.put(
-            url,
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json"
-            },
-            params={"valueInputOption": "USER_ENTERED"},
-            json={"values": request.values}
-        )
-
-        if response.status_code != 200:
-            error_detail = response.json() if response.headers.get("content-type", "").startswith("application/json") else response.text
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Failed to update Google Sheet: {error_detail}"
-            )
-
-        data = response.json()
-        return {
-            "updated_range": data.get("updatedRange"),
-            "updated_rows": data.get("updatedRows"),
-            "updated_columns": data.get("updatedColumns"),
-            "updated_cells": data.get("updatedCells")
-        }
+    return {
+        "updated_range": data.get("updatedRange"),
+        "updated_rows": data.get("updatedRows"),
+        "updated_columns": data.get("updatedColumns"),
+        "updated_cells": data.get("updatedCells")
+    }
 
 
 @router.post("/sheets/append")
@@ -197,41 +556,26 @@ async def append_sheet(
     db: AsyncSession = Depends(get_db)
 ):
     """Append rows to a Google Sheet."""
-    result = await db.execute(select(User).where(User.id == auth_user["sub"]))
-    user = result.scalar_one_or_none()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    access_token = await get_valid_google_token(user, db)
-
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{SHEETS_API_BASE}/{request.spreadsheet_id}/values/{request.range}:append",
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json"
-            },
-            params={
-                "valueInputOption": "USER_ENTERED",
-                "insertDataOption": "INSERT_ROWS"
-            },
-            json={"values": request.values}
-        )
-
-        if response.status_code != 200:
-            error_detail = response.json() if response.headers.get("content-type", "").startswith("application/json") else response.text
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Failed to append to Google Sheet: {error_detail}"
-            )
-
-        data = response.json()
-        updates = data.get("updates", {})
-        return {
-            "updated_range": updates.get("updatedRange"),
-            "updated_rows": updates.get("updatedRows"),
-            "updated_cells": updates.get("updatedCells")
-        }
+    # retry=False: replaying an append that actually landed duplicates rows
+    data = await _sheets_call(
+        auth_user, db, "POST",
+        f"{SHEETS_API_BASE}/{request.spreadsheet_id}/values/{request.range}:append",
+        "Failed to append to Google Sheet",
+        retry=False,
+        params={
+            "valueInputOption": "USER_ENTERED",
+            "insertDataOption": "INSERT_ROWS"
+        },
+        content=orjson.dumps({"values": request.values})
+    )
+    _invalidate_sheet_cache(auth_user["sub"], request.spreadsheet_id)
+
+    updates = data.get("updates", {})
+    return {
+        "updated_range": updates.get("updatedRange"),
+        "updated_rows": updates.get("updatedRows"),
+        "updated_cells": updates.get("updatedCells")
+    }
 
 
 @router.post("/sheets/read")
@@ -241,31 +585,88 @@ async def read_sheet(
     db: AsyncSession = Depends(get_db)
 ):
     """Read values from a Google Sheet."""
-    result = await db.execute(select(User).where(User.id == auth_user["sub"]))
-    user = result.scalar_one_or_none()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    access_token = await get_valid_google_token(user, db)
-
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
+    cache_key = (auth_user["sub"], request.spreadsheet_id, request.range)
+    cached = _sheet_cache_get(_read_cache, cache_key)
+    if cached is not None:
+        return cached
+
+    google_headers = await get_google_headers(auth_user, db)
+    response = await _sheets_response(
+        auth_user, db, "GET",
+        f"{SHEETS_API_BASE}/{request.spreadsheet_id}/values/{request.range}",
+        "Failed to read Google Sheet",
+        headers=_conditional_headers(_read_cache, cache_key, google_headers),
+        not_modified_ok=True
+    )
+    if response.status_code == 304:
+        payload = _revalidate_sheet_cache(_read_cache, cache_key, _READ_CACHE_TTL)
+        if payload is not None:
+            return payload
+        # Cache entry evicted mid-flight; fetch fresh without If-None-Match
+        response = await _sheets_response(
+            auth_user, db, "GET",
             f"{SHEETS_API_BASE}/{request.spreadsheet_id}/values/{request.range}",
-            headers={"Authorization": f"Bearer {access_token}"}
+            "Failed to read Google Sheet",
+            headers=google_headers
         )
 
-        if response.status_code != 200:
-            error_detail = response.json() if response.headers.get("content-type", "").startswith("application/json") else response.text
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Failed to read Google Sheet: {error_detail}"
-            )
+    data = orjson.loads(response.content)
+    payload = {
+        "range": data.get("range"),
+        "values": data.get("values", [])
+    }
+    _sheet_cache_put(_read_cache, cache_key, payload, _READ_CACHE_TTL,
+                     response.headers.get("etag"))
+    return payload
 
-        data = response.json()
-        return {
-            "range": data.get("range"),
-            "values": data.get("values", [])
-        }
+
+@router.post("/sheets/batch-read")
+async def batch_read_sheet(
+    request: BatchReadRequest,
+    auth_user: dict = Depends(require_auth),
+    db: AsyncSession = Depends(get_db)
+):
+    """Read multiple ranges from a Google Sheet in one API call.
+
+    Callers needing several ranges should use this instead of N separate
+    /sheets/read calls - one round trip and one quota unit instead of N.
+    """
+    data = await _sheets_call(
+        auth_user, db, "GET",
+        f"{SHEETS_API_BASE}/{request.spreadsheet_id}/values:batchGet",
+        "Failed to batch-read Google Sheet",
+        params=[("ranges", r) for r in request.ranges]
+    )
+    return {
+        "value_ranges": [
+            {"range": vr.get("range"), "values": vr.get("values", [])}
+            for vr in data.get("valueRanges", [])
+        ]
+    }
+
+
+@router.post("/sheets/batch-update")
+async def batch_update_sheet(
+    request: BatchUpdateRequest,
+    auth_user: dict = Depends(require_auth),
+    db: AsyncSession = Depends(get_db)
+):
+    """Update multiple ranges of a Google Sheet in one API call."""
+    data = await _sheets_call(
+        auth_user, db, "POST",
+        f"{SHEETS_API_BASE}/{request.spreadsheet_id}/values:batchUpdate",
+        "Failed to batch-update Google Sheet",
+        content=orjson.dumps({
+            "valueInputOption": "USER_ENTERED",
+            "data": [{"range": d.range, "values": d.values} for d in request.data]
+        })
+    )
+    _invalidate_sheet_cache(auth_user["sub"], request.spreadsheet_id)
+    return {
+        "total_updated_ranges": len(data.get("responses", [])),
+        "total_updated_rows": data.get("totalUpdatedRows"),
+        "total_updated_cells": data.get("totalUpdatedCells")
+    }
 
 
 @router.get("/sheets/{spreadsheet_id}")
@@ -275,37 +676,44 @@ async def get_sheet_info(
     db: AsyncSession = Depends(get_db)
 ):
     """Get metadata about a Google Sheet."""
-    result = await db.execute(select(User).where(User.id == auth_user["sub"]))
-    user = result.scalar_one_or_none()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    access_token = await get_valid_google_token(user, db)
-
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{SHEETS_API_BASE}/{spreadsheet_id}",
-            headers={"Authorization": f"Bearer {access_token}"},
+    cache_key = (auth_user["sub"], spreadsheet_id)
+    cached = _sheet_cache_get(_info_cache, cache_key)
+    if cached is not None:
+        return cached
+
+    google_headers = await get_google_headers(auth_user, db)
+    response = await _sheets_response(
+        auth_user, db, "GET", f"{SHEETS_API_BASE}/{spreadsheet_id}",
+        "Failed to get Google Sheet info",
+        headers=_conditional_headers(_info_cache, cache_key, google_headers),
+        params={"fields": "spreadsheetId,spreadsheetUrl,properties.title,sheets.properties"},
+        not_modified_ok=True
+    )
+    if response.status_code == 304:
+        payload = _revalidate_sheet_cache(_info_cache, cache_key, _INFO_CACHE_TTL)
+        if payload is not None:
+            return payload
+        # Cache entry evicted mid-flight; fetch fresh without If-None-Match
+        response = await _sheets_response(
+            auth_user, db, "GET", f"{SHEETS_API_BASE}/{spreadsheet_id}",
+            "Failed to get Google Sheet info",
+            headers=google_headers,
             params={"fields": "spreadsheetId,spreadsheetUrl,properties.title,sheets.properties"}
         )
 
-        if response.status_code != 200:
-            error_detail = response.json() if response.headers.get("content-type", "").startswith("application/json") else response.text
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Failed to get Google Sheet info: {error_detail}"
-            )
-
-        data = response.json()
-        return {
-            "spreadsheet_id": data.get("spreadsheetId"),
-            "url": data.get("spreadsheetUrl"),
-            "title": data.get("properties", {}).get("title"),
-            "sheets": [
-                {"title": s.get("properties", {}).get("title"), "index": s.get("properties", {}).get("index")}
-                for s in data.get("sheets", [])
-            ]
-        }
+    data = orjson.loads(response.content)
+    payload = {
+        "spreadsheet_id": data.get("spreadsheetId"),
+        "url": data.get("spreadsheetUrl"),
+        "title": data.get("properties", {}).get("title"),
+        "sheets": [
+            {"title": s.get("properties", {}).get("title"), "index": s.get("properties", {}).get("index")}
+            for s in data.get("sheets", [])
+        ]
+    }
+    _sheet_cache_put(_info_cache, cache_key, payload, _INFO_CACHE_TTL,
+                     response.headers.get("etag"))
+    return payload
 
 
 @router.get("/connection-status")
@@ -314,10 +722,18 @@ async def check_google_connection(
     db: AsyncSession = Depends(get_db)
 ):
     """Check if user has valid Google Drive/Sheets connection."""
-    result = await db.execute(select(User).where(User.id == auth_user["sub"]))
-    user = result.scalar_one_or_none()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    # The frontend polls this for its "connected" badge; a live token
+    # cache entry answers both questions without touching the DB (entries
+    # only exist for users who had a refresh token)
+    cached = _token_cache.get(auth_user["sub"])
+    if cached and cached[1] > datetime.utcnow():
+        return {
+            "connected": True,
+            "token_valid": True,
+            "message": "Google Drive connected"
+        }
+
+    user = await _load_oauth_user(db, auth_user)
 
     has_refresh_token = bool(user.google_refresh_token)
     token_valid = False
@@ -358,6 +774,41 @@ class CreateRoadmapRequest(BaseModel):
     phases: Optional[List[RoadmapPhase]] = None
 
 
+# Compiled once at import: parse_roadmap_markdown runs these per line, and
+# compiled patterns skip the re-cache lookup on every match
+_PHASE_RE = re.compile(
+    r'^#{1,3}\s*(?:Phase\s*)?(\d+)?[:\s-]*(.+?)(?:\s*[-–—]\s*(.+))?$', re.IGNORECASE
+)
+_BOLD_PHASE_RE = re.compile(r'^\*\*Phase\s*(\d+)[:\s-]*(.+?)\*\*', re.IGNORECASE)
+_FEATURE_RE = re.compile(r'^[-*]?\s*\*\*(.+?)\*\*[:\s]*(.*)$')
+_CHECKBOX_RE = re.compile(r'^[-*]\s*\[([ xX])\]\s*(.+)$')
+_BULLET_RE = re.compile(r'^[-*]\s+(.+)$')
+_NUMBERED_RE = re.compile(r'^\d+[.)]\s+(.+)$')
+_SHEET_NAME_RE = re.compile(r'[^\w\s-]')
+
+# Pulls all five row fields in one C-level call per item
+_ITEM_ROW_FIELDS = attrgetter("name", "description", "priority", "status", "notes")
+
+
+# Plain mutable mirrors of RoadmapItem/RoadmapPhase used inside the parse
+# loop; Pydantic validation runs once at the function boundary via
+# model_construct instead of on every matched line
+@dataclass(slots=True)
+class _RawItem:
+    name: str
+    description: str = ""
+    priority: str = ""
+    status: str = "Not Started"
+    notes: str = ""
+
+
+@dataclass(slots=True)
+class _RawPhase:
+    name: str
+    description: str = ""
+    items: List[_RawItem] = field(default_factory=list)
+
+
 def parse_roadmap_markdown(content: str) -> List[RoadmapPhase]:
     """Parse markdown roadmap content into structured phases and items.
 
@@ -369,30 +820,40 @@ def parse_roadmap_markdown(content: str) -> List[RoadmapPhase]:
     - - [x] Completed task
     - Bullet points with descriptions
     """
-    phases: List[RoadmapPhase] = []
-    current_phase: Optional[RoadmapPhase] = None
-    current_item: Optional[RoadmapItem] = None
-
-    lines = content.split('\n')
-
-    for line in lines:
-        line = line.strip()
+    phases: List[_RawPhase] = []
+    current_phase: Optional[_RawPhase] = None
+    current_item: Optional[_RawItem] = None
+    # Continuation lines buffered per item and joined once at the end;
+    # repeated `description += " " + line` is quadratic for long paragraphs
+    desc_tails: Dict[int, tuple] = {}
+
+    # splitlines + inline strip: no intermediate list of raw lines kept
+    # alive for the whole parse
+    for raw_line in content.splitlines():
+        line = raw_line.strip()
         if not line:
             continue
 
+        # Each pattern is pinned to its line's first character (#, *, -,
+        # digit), so dispatch on that before running any regex - most
+        # lines then try one or two patterns instead of all six
+        c0 = line[0]
+
         # Phase headers: ## Phase 1, ### Phase 1, # Phase 1, or **Phase 1**
-        phase_match = re.match(
-            r'^#{1,3}\s*(?:Phase\s*)?(\d+)?[:\s-]*(.+?)(?:\s*[-–—]\s*(.+))?$',
-            line, re.IGNORECASE
-        )
+        phase_match = _PHASE_RE.match(line) if c0 == '#' else None
         if phase_match:
+            # Extract and strip each group exactly once
+            phase_num, phase_title, phase_desc = phase_match.groups()
+            phase_title = phase_title.strip() if phase_title else ""
+            phase_desc = phase_desc.strip() if phase_desc else ""
+
             # Check if this is actually a feature (### Feature) inside a phase
             if line.startswith('###') and current_phase is not None:
                 # This is a feature header, not a phase
-                feature_name = phase_match.group(2).strip() if phase_match.group(2) else ""
-                if phase_match.group(3):
-                    feature_name = f"{feature_name} - {phase_match.group(3).strip()}"
-                current_item = RoadmapItem(name=feature_name)
+                feature_name = phase_title
+                if phase_desc:
+                    feature_name = f"{feature_name} - {phase_desc}"
+                current_item = _RawItem(name=feature_name)
                 current_phase.items.append(current_item)
                 continue
 
@@ -400,11 +861,11 @@ def parse_roadmap_markdown(content: str) -> List[RoadmapPhase]:
             if current_phase:
                 phases.append(current_phase)
 
-            phase_num = phase_match.group(1) or str(len(phases) + 1)
-            phase_title = phase_match.group(2).strip() if phase_match.group(2) else f"Phase {phase_num}"
-            phase_desc = phase_match.group(3).strip() if phase_match.group(3) else ""
+            phase_num = phase_num or str(len(phases) + 1)
+            if not phase_title:
+                phase_title = f"Phase {phase_num}"
 
-            current_phase = RoadmapPhase(
+            current_phase = _RawPhase(
                 name=f"Phase {phase_num}: {phase_title}" if phase_num.isdigit() else phase_title,
                 description=phase_desc
             )
@@ -412,96 +873,113 @@ def parse_roadmap_markdown(content: str) -> List[RoadmapPhase]:
             continue
 
         # Bold phase markers: **Phase 1: Title**
-        bold_phase_match = re.match(r'^\*\*Phase\s*(\d+)[:\s-]*(.+?)\*\*', line, re.IGNORECASE)
+        bold_phase_match = _BOLD_PHASE_RE.match(line) if c0 == '*' else None
         if bold_phase_match:
             if current_phase:
                 phases.append(current_phase)
 
             phase_num = bold_phase_match.group(1)
             phase_title = bold_phase_match.group(2).strip()
-            current_phase = RoadmapPhase(name=f"Phase {phase_num}: {phase_title}")
+            current_phase = _RawPhase(name=f"Phase {phase_num}: {phase_title}")
             current_item = None
             continue
 
         # If no phase yet, create a default one
         if current_phase is None:
-            current_phase = RoadmapPhase(name="Overview")
-
-        # Feature items: **Feature**: Description or - **Feature**: Description
-        feature_match = re.match(r'^[-*]?\s*\*\*(.+?)\*\*[:\s]*(.*)$', line)
-        if feature_match:
-            feature_name = feature_match.group(1).strip()
-            feature_desc = feature_match.group(2).strip()
-            current_item = RoadmapItem(name=feature_name, description=feature_desc)
-            current_phase.items.append(current_item)
-            continue
+            current_phase = _RawPhase(name="Overview")
+
+        if c0 == '-' or c0 == '*':
+            # Feature items: **Feature**: Description or - **Feature**: Description
+            feature_match = _FEATURE_RE.match(line)
+            if feature_match:
+                feature_name = feature_match.group(1).strip()
+                feature_desc = feature_match.group(2).strip()
+                current_item = _RawItem(name=feature_name, description=feature_desc)
+                current_phase.items.append(current_item)
+                continue
 
-        # Checkbox items: - [ ] Task or - [x] Completed task
-        checkbox_match = re.match(r'^[-*]\s*\[([ xX])\]\s*(.+)$', line)
-        if checkbox_match:
-            is_done = checkbox_match.group(1).lower() == 'x'
-            task_name = checkbox_match.group(2).strip()
-
-            # Parse task name and any description after colon
-            task_parts = task_name.split(':', 1)
-            item_name = task_parts[0].strip()
-            item_desc = task_parts[1].strip() if len(task_parts) > 1 else ""
-
-            current_item = RoadmapItem(
-                name=item_name,
-                description=item_desc,
-                status="Completed" if is_done else "Not Started"
-            )
-            current_phase.items.append(current_item)
-            continue
+            # Checkbox items: - [ ] Task or - [x] Completed task
+            checkbox_match = _CHECKBOX_RE.match(line)
+            if checkbox_match:
+                is_done = checkbox_match.group(1).lower() == 'x'
+                task_name = checkbox_match.group(2).strip()
+
+                # Parse task name and any description after colon
+                task_parts = task_name.split(':', 1)
+                item_name = task_parts[0].strip()
+                item_desc = task_parts[1].strip() if len(task_parts) > 1 else ""
+
+                current_item = _RawItem(
+                    name=item_name,
+                    description=item_desc,
+                    status="Completed" if is_done else "Not Started"
+                )
+                current_phase.items.append(current_item)
+                continue
 
-        # Regular bullet points: - Item or * Item
-        bullet_match = re.match(r'^[-*]\s+(.+)$', line)
-        if bullet_match:
-            item_text = bullet_match.group(1).strip()
-
-            # Check for "Name: Description" format
-            if ':' in item_text:
-                parts = item_text.split(':', 1)
-                item_name = parts[0].strip()
-                item_desc = parts[1].strip()
-            else:
-                item_name = item_text
-                item_desc = ""
-
-            current_item = RoadmapItem(name=item_name, description=item_desc)
-            current_phase.items.append(current_item)
-            continue
+            # Regular bullet points: - Item or * Item
+            bullet_match = _BULLET_RE.match(line)
+            if bullet_match:
+                item_text = bullet_match.group(1).strip()
+
+                # Check for "Name: Description" format
+                if ':' in item_text:
+                    parts = item_text.split(':', 1)
+                    item_name = parts[0].strip()
+                    item_desc = parts[1].strip()
+                else:
+                    item_name = item_text
+                    item_desc = ""
+
+                current_item = _RawItem(name=item_name, description=item_desc)
+                current_phase.items.append(current_item)
+                continue
 
-        # Numbered items: 1. Item or 1) Item
-        numbered_match = re.match(r'^\d+[.)]\s+(.+)$', line)
-        if numbered_match:
-            item_text = numbered_match.group(1).strip()
-
-            if ':' in item_text:
-                parts = item_text.split(':', 1)
-                item_name = parts[0].strip()
-                item_desc = parts[1].strip()
-            else:
-                item_name = item_text
-                item_desc = ""
-
-            current_item = RoadmapItem(name=item_name, description=item_desc)
-            current_phase.items.append(current_item)
-            continue
+        elif c0.isdigit():
+            # Numbered items: 1. Item or 1) Item
+            numbered_match = _NUMBERED_RE.match(line)
+            if numbered_match:
+                item_text = numbered_match.group(1).strip()
+
+                if ':' in item_text:
+                    parts = item_text.split(':', 1)
+                    item_name = parts[0].strip()
+                    item_desc = parts[1].strip()
+                else:
+                    item_name = item_text
+                    item_desc = ""
+
+                current_item = _RawItem(name=item_name, description=item_desc)
+                current_phase.items.append(current_item)
+                continue
 
         # Plain text following a feature - treat as description continuation
         if current_item and line and not line.startswith('#'):
-            if current_item.description:
-                current_item.description += " " + line
-            else:
-                current_item.description = line
+            desc_tails.setdefault(id(current_item), (current_item, []))[1].append(line)
 
     # Don't forget the last phase
     if current_phase:
         phases.append(current_phase)
 
-    return phases
+    # Attach the buffered continuations with one join per item
+    for item, parts in desc_tails.values():
+        item.description = " ".join((item.description, *parts)) if item.description else " ".join(parts)
+
+    # All fields are internally produced strings, so skip re-validation
+    return [
+        RoadmapPhase.model_construct(
+            name=p.name,
+            description=p.description,
+            items=[
+                RoadmapItem.model_construct(
+                    name=i.name, description=i.description, priority=i.priority,
+                    status=i.status, notes=i.notes
+                )
+                for i in p.items
+            ]
+        )
+        for p in phases
+    ]
 
 
 def phases_to_sheet_data(phases: List[RoadmapPhase]) -> Dict[str, List[List[str]]]:
@@ -535,7 +1013,7 @@ def phases_to_sheet_data(phases: List[RoadmapPhase]) -> Dict[str, List[List[str]
     # Individual phase sheets
     for i, phase in enumerate(phases, 1):
         # Sanitize sheet name (max 100 chars, no special chars)
-        sheet_name = re.sub(r'[^\w\s-]', '', phase.name)[:50].strip()
+        sheet_name = _SHEET_NAME_RE.sub('', phase.name)[:50].strip()
         if not sheet_name:
             sheet_name = f"Phase{i}"
 
@@ -543,14 +1021,10 @@ def phases_to_sheet_data(phases: List[RoadmapPhase]) -> Dict[str, List[List[str]
             ["Item", "Description", "Priority", "Status", "Notes"],
         ]
 
-        for item in phase.items:
-            phase_rows.append([
-                item.name,
-                item.description or "",
-                item.priority or "Medium",
-                item.status or "Not Started",
-                item.notes or ""
-            ])
+        phase_rows.extend(
+            [name, desc or "", priority or "Medium", item_status or "Not Started", notes or ""]
+            for name, desc, priority, item_status, notes in map(_ITEM_ROW_FIELDS, phase.items)
+        )
 
         # Ensure unique sheet names
         if sheet_name in sheets_data:
@@ -561,6 +1035,70 @@ def phases_to_sheet_data(phases: List[RoadmapPhase]) -> Dict[str, List[List[str]
     return sheets_data
 
 
+# Parsing is deterministic, so identical markdown (double-clicked create
+# button, frontend retry) reuses the previous result instead of re-running
+# the parser. Keyed by digest so the cache doesn't pin large content strings.
+_roadmap_parse_cache: Dict[str, tuple] = {}
+_ROADMAP_PARSE_CACHE_MAX = 128
+
+
+def _parse_and_convert(content: str) -> tuple:
+    """Memoized parse_roadmap_markdown + phases_to_sheet_data."""
+    key = hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+    hit = _roadmap_parse_cache.get(key)
+    if hit is not None:
+        return hit
+    phases = parse_roadmap_markdown(content)
+    result = (phases, phases_to_sheet_data(phases))
+    if len(_roadmap_parse_cache) >= _ROADMAP_PARSE_CACHE_MAX:
+        _roadmap_parse_cache.clear()
+    _roadmap_parse_cache[key] = result
+    return result
+
+
+# Header-row styling applied inline at creation time
+_ROADMAP_HEADER_FORMAT = {
+    "textFormat": {"bold": True},
+    "backgroundColor": {"red": 0.9, "green": 0.9, "blue": 0.9}
+}
+
+
+def _roadmap_create_body(title: str, sheets_data: Dict[str, List[List[str]]]) -> dict:
+    """Build a full Spreadsheet resource for one spreadsheets.create call.
+
+    spreadsheets.create accepts per-sheet rowData and cell formats, so the
+    data fill and header formatting ride along with creation instead of
+    needing two follow-up batchUpdate round trips.
+    """
+    sheets = []
+    for name, rows in sheets_data.items():
+        row_data = []
+        for row_index, row in enumerate(rows):
+            values = []
+            for cell in row:
+                # USER_ENTERED semantics: leading "=" means a formula
+                value = {
+                    "userEnteredValue": (
+                        {"formulaValue": cell} if cell.startswith("=")
+                        else {"stringValue": cell}
+                    )
+                }
+                if row_index == 0:
+                    value["userEnteredFormat"] = _ROADMAP_HEADER_FORMAT
+                values.append(value)
+            row_data.append({"values": values})
+
+        sheets.append({
+            "properties": {
+                "title": name,
+                "gridProperties": {"frozenRowCount": 1}
+            },
+            "data": [{"startRow": 0, "startColumn": 0, "rowData": row_data}]
+        })
+
+    return {"properties": {"title": title}, "sheets": sheets}
+
+
 @router.post("/sheets/create-roadmap")
 async def create_roadmap_sheet(
     request: CreateRoadmapRequest,
@@ -576,18 +1114,12 @@ async def create_roadmap_sheet(
     - An Overview sheet summarizing all phases
     - Individual sheets for each phase with detailed items
     """
-    result = await db.execute(select(User).where(User.id == auth_user["sub"]))
-    user = result.scalar_one_or_none()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    access_token = await get_valid_google_token(user, db)
-
     # Parse the markdown content into phases
     if request.phases:
         phases = request.phases
+        sheets_data = phases_to_sheet_data(phases)
     else:
-        phases = parse_roadmap_markdown(request.content)
+        phases, sheets_data = _parse_and_convert(request.content)
 
     if not phases:
         raise HTTPException(
@@ -595,126 +1127,34 @@ async def create_roadmap_sheet(
             detail="Could not parse any phases from the provided content"
         )
 
-    # Convert phases to sheet data
-    sheets_data = phases_to_sheet_data(phases)
     sheet_names = list(sheets_data.keys())
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        # Step 1: Create the spreadsheet with all sheets
-        create_body = {
-            "properties": {"title": request.title},
-            "sheets": [{"properties": {"title": name}} for name in sheet_names]
-        }
-
-        create_response = await client.post(
-            SHEETS_API_BASE,
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json"
-            },
-            json=create_body
-        )
-
-        if create_response.status_code != 200:
-            error_detail = create_response.json() if create_response.headers.get("content-type", "").startswith("application/json") else create_response.text
-            raise HTTPException(
-                status_code=create_response.status_code,
-                detail=f"Failed to create spreadsheet: {error_detail}"
-            )
-
-        create_data = create_response.json()
-        spreadsheet_id = create_data["spreadsheetId"]
-        spreadsheet_url = create_data["spreadsheetUrl"]
-
-        # Step 2: Batch update all sheets with data
-        batch_data = []
-        for sheet_name, rows in sheets_data.items():
-            batch_data.append({
-                "range": f"'{sheet_name}'!A1",
-                "values": rows
-            })
-
-        batch_response = await client.post(
-            f"{SHEETS_API_BASE}/{spreadsheet_id}/values:batchUpdate",
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "valueInputOption": "USER_ENTERED",
-                "data": batch_data
-            }
-        )
-
-        if batch_response.status_code != 200:
-            error_detail = batch_response.json() if batch_response.headers.get("content-type", "").startswith("application/json") else batch_response.text
-            raise HTTPException(
-                status_code=batch_response.status_code,
-                detail=f"Failed to populate spreadsheet: {error_detail}"
-            )
-
-        # Step 3: Format the header rows (bold, freeze)
-        sheet_id_map = {
-            s.get("properties", {}).get("title"): s.get("properties", {}).get("sheetId")
-            for s in create_data.get("sheets", [])
-        }
-
-        format_requests = []
-        for sheet_name in sheet_names:
-            sheet_id = sheet_id_map.get(sheet_name)
-            if sheet_id is not None:
-                # Bold header row
-                format_requests.append({
-                    "repeatCell": {
-                        "range": {
-                            "sheetId": sheet_id,
-                            "startRowIndex": 0,
-                            "endRowIndex": 1
-                        },
-                        "cell": {
-                            "userEnteredFormat": {
-                                "textFormat": {"bold": True},
-                                "backgroundColor": {"red": 0.9, "green": 0.9, "blue": 0.9}
-                            }
-                        },
-                        "fields": "userEnteredFormat(textFormat,backgroundColor)"
-                    }
-                })
-                # Freeze header row
-                format_requests.append({
-                    "updateSheetProperties": {
-                        "properties": {
-                            "sheetId": sheet_id,
-                            "gridProperties": {"frozenRowCount": 1}
-                        },
-                        "fields": "gridProperties.frozenRowCount"
-                    }
-                })
-
-        if format_requests:
-            await client.post(
-                f"{SHEETS_API_BASE}/{spreadsheet_id}:batchUpdate",
-                headers={
-                    "Authorization": f"Bearer {access_token}",
-                    "Content-Type": "application/json"
-                },
-                json={"requests": format_requests}
-            )
-
-        # Build summary of what was created
-        phase_summaries = []
-        for phase in phases:
-            phase_summaries.append({
-                "name": phase.name,
-                "item_count": len(phase.items),
-                "description": phase.description
-            })
+    # One spreadsheets.create call carries the sheet data, header
+    # formatting and frozen rows that used to take two extra batchUpdates.
+    # retry=False: spreadsheets.create is not idempotent
+    create_data = await _sheets_call(
+        auth_user, db, "POST", SHEETS_API_BASE, "Failed to create spreadsheet",
+        retry=False,
+        content=orjson.dumps(_roadmap_create_body(request.title, sheets_data)),
+        timeout=60.0
+    )
+    spreadsheet_id = create_data["spreadsheetId"]
+    spreadsheet_url = create_data["spreadsheetUrl"]
+
+    # Build summary of what was created
+    phase_summaries = []
+    for phase in phases:
+        phase_summaries.append({
+            "name": phase.name,
+            "item_count": len(phase.items),
+            "description": phase.description
+        })
 
-        return {
-            "spreadsheet_id": spreadsheet_id,
-            "url": spreadsheet_url,
-            "title": request.title,
-            "sheets": sheet_names,
-            "phases": phase_summaries,
-            "total_items": sum(len(p.items) for p in phases)
-        }
+    return {
+        "spreadsheet_id": spreadsheet_id,
+        "url": spreadsheet_url,
+        "title": request.title,
+        "sheets": sheet_names,
+        "phases": phase_summaries,
+        "total_items": sum(len(p.items) for p in phases)
+    }
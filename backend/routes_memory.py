@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, and_, case, or_
 from pydantic import BaseModel
 from typing import List, Optional
 from uuid import UUID
@@ -44,10 +44,16 @@ class MemoryResponse(BaseModel):
 async def list_memories(
     employee_id: Optional[str] = None,
     project_id: Optional[str] = None,
+    before: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
     user: dict = Depends(require_auth),
     db: AsyncSession = Depends(get_db)
-) -> List[MemoryResponse]:
-    """List memories. Supports filtering by employee_id and/or project_id."""
+) -> List[dict]:
+    """List memories. Supports filtering by employee_id and/or project_id.
+
+    Keyset pagination: pass ``limit`` plus the ``created_at`` of the last
+    row already seen as ``before`` to fetch the next page.
+    """
     user_id = UUID(user["sub"])
 
     query = (
@@ -61,57 +67,66 @@ async def list_memories(
         query = query.where(Memory.employee_id == UUID(employee_id))
     if project_id:
         query = query.where(Memory.project_id == UUID(project_id))
+    if before:
+        query = query.where(Memory.created_at < before)
 
     query = query.order_by(Memory.created_at.desc())
+    if limit:
+        query = query.limit(limit)
     result = await db.execute(query)
 
-    rows = result.all()
     return [
-        MemoryResponse(
-            id=str(memory.id),
-            content=memory.content,
-            employee_id=str(memory.employee_id) if memory.employee_id else None,
-            employee_name=emp_name,
-            project_id=str(memory.project_id) if memory.project_id else None,
-            project_name=proj_name,
-            category=memory.category,
-            created_at=memory.created_at,
-            updated_at=memory.updated_at
-        )
-        for memory, emp_name, proj_name in rows
+        {
+            "id": str(memory.id),
+            "content": memory.content,
+            "employee_id": str(memory.employee_id) if memory.employee_id else None,
+            "employee_name": emp_name,
+            "project_id": str(memory.project_id) if memory.project_id else None,
+            "project_name": proj_name,
+            "category": memory.category,
+            "created_at": memory.created_at,
+            "updated_at": memory.updated_at
+        }
+        for memory, emp_name, proj_name in result.all()
     ]
 
 
 @router.get("/all")
 async def list_all_memories(
+    before: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
     user: dict = Depends(require_auth),
     db: AsyncSession = Depends(get_db)
-) -> List[MemoryResponse]:
+) -> List[dict]:
     """List all memories (shared + role-specific + project-scoped) for UI display."""
     user_id = UUID(user["sub"])
 
-    result = await db.execute(
+    query = (
         select(Memory, Employee.name, Project.name)
         .outerjoin(Employee, Memory.employee_id == Employee.id)
         .outerjoin(Project, Memory.project_id == Project.id)
         .where(Memory.owner_id == user_id)
         .order_by(Memory.created_at.desc())
     )
+    if before:
+        query = query.where(Memory.created_at < before)
+    if limit:
+        query = query.limit(limit)
+    result = await db.execute(query)
 
-    rows = result.all()
     return [
-        MemoryResponse(
-            id=str(memory.id),
-            content=memory.content,
-            employee_id=str(memory.employee_id) if memory.employee_id else None,
-            employee_name=emp_name,
-            project_id=str(memory.project_id) if memory.project_id else None,
-            project_name=proj_name,
-            category=memory.category,
-            created_at=memory.created_at,
-            updated_at=memory.updated_at
-        )
-        for memory, emp_name, proj_name in rows
+        {
+            "id": str(memory.id),
+            "content": memory.content,
+            "employee_id": str(memory.employee_id) if memory.employee_id else None,
+            "employee_name": emp_name,
+            "project_id": str(memory.project_id) if memory.project_id else None,
+            "project_name": proj_name,
+            "category": memory.category,
+            "created_at": memory.created_at,
+            "updated_at": memory.updated_at
+        }
+        for memory, emp_name, proj_name in result.all()
     ]
 
 
@@ -120,38 +135,42 @@ async def create_memory(
     data: MemoryCreate,
     user: dict = Depends(require_auth),
     db: AsyncSession = Depends(get_db)
-) -> MemoryResponse:
+):
     """Create a new memory. Can be shared, employee-specific, or project-scoped."""
     user_id = UUID(user["sub"])
 
-    employee_uuid = None
+    employee_uuid = UUID(data.employee_id) if data.employee_id else None
+    project_uuid = UUID(data.project_id) if data.project_id else None
     employee_name = None
-    project_uuid = None
     project_name = None
 
-    if data.employee_id:
-        # Verify employee belongs to user
-        result = await db.execute(
-            select(Employee)
-            .where(Employee.id == UUID(data.employee_id), Employee.owner_id == user_id)
-        )
-        employee = result.scalar_one_or_none()
-        if employee is None:
-            raise HTTPException(status_code=404, detail="Employee not found")
-        employee_uuid = employee.id
-        employee_name = employee.name
-
-    if data.project_id:
-        # Verify project belongs to user
-        result = await db.execute(
-            select(Project)
-            .where(Project.id == UUID(data.project_id), Project.owner_id == user_id)
-        )
-        project = result.scalar_one_or_none()
-        if project is None:
-            raise HTTPException(status_code=404, detail="Project not found")
-        project_uuid = project.id
-        project_name = project.name
+    # Verify ownership and fetch the display names in a single round trip:
+    # each scalar subquery comes back NULL when the row is missing or
+    # belongs to someone else
+    if employee_uuid or project_uuid:
+        name_cols = []
+        if employee_uuid:
+            name_cols.append(
+                select(Employee.name)
+                .where(Employee.id == employee_uuid, Employee.owner_id == user_id)
+                .scalar_subquery()
+            )
+        if project_uuid:
+            name_cols.append(
+                select(Project.name)
+                .where(Project.id == project_uuid, Project.owner_id == user_id)
+                .scalar_subquery()
+            )
+        names = iter((await db.execute(select(*name_cols))).one())
+
+        if employee_uuid:
+            employee_name = next(names)
+            if employee_name is None:
+                raise HTTPException(status_code=404, detail="Employee not found")
+        if project_uuid:
+            project_name = next(names)
+            if project_name is None:
+                raise HTTPException(status_code=404, detail="Project not found")
 
     memory = Memory(
         owner_id=user_id,
@@ -162,9 +181,11 @@ async def create_memory(
     )
     db.add(memory)
     await db.commit()
-    await db.refresh(memory)
+    # id and the timestamps are Python-side defaults, so no refresh round trip
 
-    return MemoryResponse(
+    # model_construct skips validation; every field here is built from
+    # values we just wrote ourselves
+    return MemoryResponse.model_construct(
         id=str(memory.id),
         content=memory.content,
         employee_id=str(memory.employee_id) if memory.employee_id else None,
@@ -183,7 +204,7 @@ async def update_memory(
     data: MemoryUpdate,
     user: dict = Depends(require_auth),
     db: AsyncSession = Depends(get_db)
-) -> MemoryResponse:
+):
     """Update a memory."""
     user_id = UUID(user["sub"])
 
@@ -206,7 +227,7 @@ async def update_memory(
     await db.commit()
     await db.refresh(memory)
 
-    return MemoryResponse(
+    return MemoryResponse.model_construct(
         id=str(memory.id),
         content=memory.content,
         employee_id=str(memory.employee_id) if memory.employee_id else None,
@@ -243,63 +264,42 @@ async def delete_memory(
     return {"status": "ok"}
 
 
+# Shared memories: attached to neither an employee nor a project
+_SHARED_MEMORY = and_(Memory.employee_id.is_(None), Memory.project_id.is_(None))
+
+
 async def get_memories_for_employee(db: AsyncSession, user_id: UUID, employee_id: UUID, project_id: UUID = None) -> List[str]:
     """Get all relevant memories for an employee (shared + role-specific + project-scoped).
     Used by chat to inject into context."""
-    # Get shared memories (no employee, no project)
-    shared_result = await db.execute(
-        select(Memory.content)
-        .where(
-            Memory.owner_id == user_id,
-            Memory.employee_id.is_(None),
-            Memory.project_id.is_(None)
-        )
-        .order_by(Memory.created_at)
+    # One SELECT instead of three sequential round-trips: OR the scopes
+    # together and recover the shared -> role -> project grouping with a
+    # CASE bucket in the ORDER BY
+    predicates = [_SHARED_MEMORY, Memory.employee_id == employee_id]
+    bucket = case(
+        (_SHARED_MEMORY, 0),
+        (Memory.employee_id == employee_id, 1),
+        else_=2
     )
-    shared_memories = [row[0] for row in shared_result.all()]
+    if project_id:
+        predicates.append(Memory.project_id == project_id)
 
-    # Get role-specific memories
-    role_result = await db.execute(
+    result = await db.execute(
         select(Memory.content)
-        .where(Memory.owner_id == user_id, Memory.employee_id == employee_id)
-        .order_by(Memory.created_at)
+        .where(Memory.owner_id == user_id, or_(*predicates))
+        .order_by(bucket, Memory.created_at)
     )
-    role_memories = [row[0] for row in role_result.all()]
-
-    # Get project-specific memories if project_id provided
-    project_memories = []
-    if project_id:
-        project_result = await db.execute(
-            select(Memory.content)
-            .where(Memory.owner_id == user_id, Memory.project_id == project_id)
-            .order_by(Memory.created_at)
-        )
-        project_memories = [row[0] for row in project_result.all()]
-
-    return shared_memories + role_memories + project_memories
+    return [row[0] for row in result.all()]
 
 
 async def get_memories_for_project(db: AsyncSession, user_id: UUID, project_id: UUID) -> List[str]:
     """Get all memories relevant to a project (shared + project-scoped).
     Used by project chat to inject into context."""
-    # Get shared memories
-    shared_result = await db.execute(
+    result = await db.execute(
         select(Memory.content)
         .where(
             Memory.owner_id == user_id,
-            Memory.employee_id.is_(None),
-            Memory.project_id.is_(None)
+            or_(_SHARED_MEMORY, Memory.project_id == project_id)
         )
-        .order_by(Memory.created_at)
+        .order_by(case((_SHARED_MEMORY, 0), else_=1), Memory.created_at)
     )
-    shared_memories = [row[0] for row in shared_result.all()]
-
-    # Get project-specific memories
-    project_result = await db.execute(
-        select(Memory.content)
-        .where(Memory.owner_id == user_id, Memory.project_id == project_id)
-        .order_by(Memory.created_at)
-    )
-    project_memories = [row[0] for row in project_result.all()]
-
-    return shared_memories + project_memories
+    return [row[0] for row in result.all()]
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 from datetime import datetime
+import time
 
 from auth import require_auth
 from database import get_db
@@ -12,6 +13,16 @@ from models import MemorySuggestion, Memory, Employee
 
 router = APIRouter(prefix="/api/memory-suggestions", tags=["memory-suggestions"])
 
+# UI badges poll /pending-count every few seconds per open tab; answer
+# repeats from a short-lived per-user cache instead of hitting Postgres.
+# Writes that change the count drop the user's entry.
+_PENDING_COUNT_TTL = 5.0  # seconds
+_pending_count_cache: Dict[UUID, Tuple[float, int]] = {}
+
+
+def _invalidate_pending_count(user_id: UUID) -> None:
+    _pending_count_cache.pop(user_id, None)
+
 
 class MemorySuggestionCreate(BaseModel):
     employee_id: str
@@ -35,45 +46,49 @@ class MemorySuggestionResponse(BaseModel):
 async def list_memory_suggestions(
     status: Optional[str] = "pending",
     employee_id: Optional[str] = None,
+    before: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
     user: dict = Depends(require_auth),
     db: AsyncSession = Depends(get_db)
 ) -> List[dict]:
-    """List memory suggestions, optionally filtered by status or employee."""
+    """List memory suggestions, optionally filtered by status or employee.
+
+    Keyset pagination: pass ``limit`` plus the ``created_at`` of the last
+    row already seen as ``before`` to fetch the next page.
+    """
     user_id = UUID(user["sub"])
 
-    query = select(MemorySuggestion).where(MemorySuggestion.owner_id == user_id)
+    # Employee names come along in the same round trip via an outer join
+    query = (
+        select(MemorySuggestion, Employee.name)
+        .outerjoin(Employee, MemorySuggestion.employee_id == Employee.id)
+        .where(MemorySuggestion.owner_id == user_id)
+    )
 
     if status:
         query = query.where(MemorySuggestion.status == status)
     if employee_id:
         query = query.where(MemorySuggestion.employee_id == UUID(employee_id))
+    if before:
+        query = query.where(MemorySuggestion.created_at < before)
 
     query = query.order_by(MemorySuggestion.created_at.desc())
+    if limit:
+        query = query.limit(limit)
     result = await db.execute(query)
-    suggestions = result.scalars().all()
-
-    # Get employee names
-    employee_ids = list(set(s.employee_id for s in suggestions if s.employee_id))
-    employees_map = {}
-    if employee_ids:
-        result = await db.execute(
-            select(Employee).where(Employee.id.in_(employee_ids))
-        )
-        for emp in result.scalars().all():
-            employees_map[emp.id] = emp.name
 
     return [
         {
             "id": str(s.id),
             "employee_id": str(s.employee_id),
-            "employee_name": employees_map.get(s.employee_id, "Unknown"),
+            "employee_name": emp_name if emp_name is not None else "Unknown",
             "project_id": str(s.project_id) if s.project_id else None,
             "content": s.content,
             "category": s.category,
             "status": s.status,
             "created_at": s.created_at.isoformat() if s.created_at else None
         }
-        for s in suggestions
+        for s, emp_name in result.all()
     ]
 
 
@@ -89,13 +104,13 @@ async def create_memory_suggestion(
     """
     user_id = UUID(user["sub"])
 
-    # Verify employee exists and belongs to user
+    # Verify employee exists and belongs to user; only the name is needed
     result = await db.execute(
-        select(Employee)
+        select(Employee.name)
         .where(Employee.id == UUID(data.employee_id), Employee.owner_id == user_id)
     )
-    employee = result.scalar_one_or_none()
-    if not employee:
+    employee_name = result.scalar_one_or_none()
+    if employee_name is None:
         raise HTTPException(status_code=404, detail="Employee not found")
 
     suggestion = MemorySuggestion(
@@ -108,12 +123,13 @@ async def create_memory_suggestion(
     )
     db.add(suggestion)
     await db.commit()
-    await db.refresh(suggestion)
+    # id/created_at are Python-side defaults, so no refresh round trip
+    _invalidate_pending_count(user_id)
 
     return {
         "id": str(suggestion.id),
         "employee_id": str(suggestion.employee_id),
-        "employee_name": employee.name,
+        "employee_name": employee_name,
         "project_id": str(suggestion.project_id) if suggestion.project_id else None,
         "content": suggestion.content,
         "category": suggestion.category,
@@ -163,6 +179,7 @@ async def approve_memory_suggestion(
 
     await db.commit()
     await db.refresh(memory)
+    _invalidate_pending_count(user_id)
 
     return {
         "status": "approved",
@@ -201,6 +218,7 @@ async def reject_memory_suggestion(
     suggestion.resolved_at = datetime.utcnow()
 
     await db.commit()
+    _invalidate_pending_count(user_id)
 
     return {
         "status": "rejected",
@@ -216,17 +234,35 @@ async def get_pending_count(
     """Get count of pending memory suggestions (for UI badges)."""
     user_id = UUID(user["sub"])
 
+    cached = _pending_count_cache.get(user_id)
+    if cached and time.monotonic() - cached[0] < _PENDING_COUNT_TTL:
+        return {"pending_count": cached[1]}
+
     result = await db.execute(
-        select(MemorySuggestion)
+        select(func.count())
+        .select_from(MemorySuggestion)
         .where(MemorySuggestion.owner_id == user_id, MemorySuggestion.status == "pending")
     )
-    pending = result.scalars().all()
+
+    count = result.scalar_one()
+    _pending_count_cache[user_id] = (time.monotonic(), count)
 
     return {
-        "pending_count": len(pending)
+        "pending_count": count
     }
 
 
+async def _load_suggestions(db: AsyncSession, user_id: UUID, suggestion_ids: List[str]) -> dict:
+    """Fetch a batch of the user's suggestions as an id -> row map."""
+    result = await db.execute(
+        select(MemorySuggestion).where(
+            MemorySuggestion.id.in_({UUID(sid) for sid in suggestion_ids}),
+            MemorySuggestion.owner_id == user_id
+        )
+    )
+    return {s.id: s for s in result.scalars().all()}
+
+
 @router.post("/bulk-approve")
 async def bulk_approve_suggestions(
     suggestion_ids: List[str],
@@ -239,34 +275,36 @@ async def bulk_approve_suggestions(
     approved = []
     failed = []
 
+    # One SELECT for the whole batch instead of one round-trip per id
+    suggestions = await _load_suggestions(db, user_id, suggestion_ids)
+
+    now = datetime.utcnow()
+    memories = []
     for sid in suggestion_ids:
-        result = await db.execute(
-            select(MemorySuggestion)
-            .where(MemorySuggestion.id == UUID(sid), MemorySuggestion.owner_id == user_id)
-        )
-        suggestion = result.scalar_one_or_none()
+        suggestion = suggestions.get(UUID(sid))
 
         if suggestion is None or suggestion.status != "pending":
             failed.append(sid)
             continue
 
         # Create memory
-        memory = Memory(
+        memories.append(Memory(
             owner_id=user_id,
             employee_id=suggestion.employee_id,
             project_id=suggestion.project_id,
             content=suggestion.content,
             category=suggestion.category
-        )
-        db.add(memory)
+        ))
 
         # Update suggestion
         suggestion.status = "approved"
-        suggestion.resolved_at = datetime.utcnow()
+        suggestion.resolved_at = now
 
         approved.append(sid)
 
+    db.add_all(memories)
     await db.commit()
+    _invalidate_pending_count(user_id)
 
     return {
         "approved": approved,
@@ -288,23 +326,23 @@ async def bulk_reject_suggestions(
     rejected = []
     failed = []
 
+    suggestions = await _load_suggestions(db, user_id, suggestion_ids)
+
+    now = datetime.utcnow()
     for sid in suggestion_ids:
-        result = await db.execute(
-            select(MemorySuggestion)
-            .where(MemorySuggestion.id == UUID(sid), MemorySuggestion.owner_id == user_id)
-        )
-        suggestion = result.scalar_one_or_none()
+        suggestion = suggestions.get(UUID(sid))
 
         if suggestion is None or suggestion.status != "pending":
             failed.append(sid)
             continue
 
         suggestion.status = "rejected"
-        suggestion.resolved_at = datetime.utcnow()
+        suggestion.resolved_at = now
 
         rejected.append(sid)
 
     await db.commit()
+    _invalidate_pending_count(user_id)
 
     return {
         "rejected": rejected,